@@ -1,10 +1,14 @@
 import dash
 from dash import Dash, html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
+from flask import jsonify
 import logging
+import os
 import time
 
-from utils import load_data, get_price_history
+import global_variables
+from utils import get_price_history
+from utils.cache import get_cache_stats
 
 # Logging setup
 logging.basicConfig(
@@ -42,7 +46,6 @@ nav = dbc.Nav(
 app.layout = html.Div([
     dcc.Location(id='main-url', refresh=True),
     dcc.Store(id="selected-cards", storage_type="session"),
-    dcc.Store(id="cards-metadata", data=load_data("cards_metadata_table.csv").to_dict("records")),
     #dcc.Store(id='price-history', data=get_price_history().to_dict("records")),
 
 
@@ -57,6 +60,17 @@ app.layout = html.Div([
 ])
 
 
+# Datasets load on first use; warm them up in a background thread so the
+# server accepts requests right away. DASHBOARD_WARM_UP=0 disables this
+# (e.g. for workers that only serve a few endpoints).
+if os.environ.get("DASHBOARD_WARM_UP", "1") != "0":
+    global_variables.warm_up()
+
+# Cache hit/miss counters for monitoring
+@app.server.route("/cache-stats")
+def cache_stats():
+    return jsonify(get_cache_stats())
+
 
 if __name__ == "__main__":
     app.run(debug=True)
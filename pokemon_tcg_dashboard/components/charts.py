@@ -48,12 +48,11 @@ import logging
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
-from global_variables import PRICE_HISTORY_DF, CARD_METADATA_DF, EBAY_METADATA_DF, SET_PRICE_HISTORY_DFS
+import global_variables
 from utils import calculate_cat_vol_price
 # ----------------------------- Call data -------------------------------------
-ebay_df = EBAY_METADATA_DF.set_index('date')
-metadata_df = CARD_METADATA_DF
-price_history_df = PRICE_HISTORY_DF.set_index('date')
+# Datasets are read from global_variables when a chart is built, so importing
+# this module does not load them.
 #portfolio_sample_df = load_data('portfolio_cards_metadata_table.csv')
 
 # ------------------------------ Merge Data --------------------------------------
@@ -78,7 +77,7 @@ def merge_ebay_metadata_dfs(ebay_df, metadata_df):
 # Price History + Metadata
 def merge_price_history_metadata_dfs(price_history_metadata, metadata_df):
     logger.debug("merge_price_history_metadata_dfs was called!")
-    price_history_metadata = price_history_df.merge(
+    price_history_metadata = price_history_metadata.merge(
         metadata_df[["id", "setId", "setName", "totalSetNumber", "updatedAt"]],
         on="id",
         how="left"
@@ -91,8 +90,9 @@ def merge_price_history_metadata_dfs(price_history_metadata, metadata_df):
 def merge_all_pricing_dfs():
     logger.debug("merge_all_pricing_dfs was called!")
     # All three combined
-    ebay_metadata = merge_ebay_metadata_dfs(ebay_df, metadata_df)
-    price_history_metadata = merge_price_history_metadata_dfs(price_history_df, metadata_df)
+    metadata_df = global_variables.CARD_METADATA_DF
+    ebay_metadata = merge_ebay_metadata_dfs(global_variables.EBAY_METADATA_DF.set_index('date'), metadata_df)
+    price_history_metadata = merge_price_history_metadata_dfs(global_variables.PRICE_HISTORY_DF.set_index('date'), metadata_df)
     market_df = ebay_metadata.merge(
         price_history_metadata[["id", "setId", "setName", "totalSetNumber", "updatedAt"]],
         on=['id'],
@@ -114,14 +114,14 @@ def compute_price_change(ebay_metadata):
 
     # Group by set/day and compute average price per setName per day
     set_daily = (
-        ebay_metadata.groupby(['setName', 'date'])['average']
+        ebay_metadata.groupby(['setName', 'date'], observed=True)['average']
         .mean()
         .reset_index()
         .sort_values(by=['setName', 'date'])
     )
 
     # Compute previous day price and percentage change
-    set_daily['prev_price'] = set_daily.groupby('setName')['average'].shift(1)
+    set_daily['prev_price'] = set_daily.groupby('setName', observed=True)['average'].shift(1)
     set_daily['price_change'] = set_daily['average'] - set_daily['prev_price']
     set_daily['pct_change'] = (set_daily['price_change'] / set_daily['prev_price']) * 100
     set_daily['pct_change'] = set_daily['pct_change'].fillna(0)
@@ -129,7 +129,7 @@ def compute_price_change(ebay_metadata):
     # Keep latest price change per set
     latest_set_prices = (
         set_daily.sort_values('date')
-                .groupby('setName')
+                .groupby('setName', observed=True)
                 .tail(1)
                 .reset_index(drop=True)
     )
@@ -153,7 +153,7 @@ def market_view_set_performance_bar_chart(time_range="All Time"):
     - Plotly Figure
     """
     # 'date' is datetime
-    ebay_metadata_df = merge_ebay_metadata_dfs(ebay_df, metadata_df)
+    ebay_metadata_df = merge_ebay_metadata_dfs(global_variables.EBAY_METADATA_DF.set_index('date'), global_variables.CARD_METADATA_DF)
     latest_set_prices = compute_price_change(ebay_metadata_df)
     latest_set_prices['date'] = pd.to_datetime(latest_set_prices['date'])
     max_date = latest_set_prices['date'].max()
@@ -207,7 +207,7 @@ def market_view_set_performance_bar_chart(time_range="All Time"):
 def create_top_sets_table(price_col="price", days=7, set_names=None):
     logger.debug(f"Calling create_top_sets_table")
     days = int(days)
-    set_price_history_df = SET_PRICE_HISTORY_DFS.copy()
+    set_price_history_df = global_variables.SET_PRICE_HISTORY_DFS.copy()
 
     if set_names is not None:
         if isinstance(set_names, str):
@@ -332,17 +332,20 @@ def create_top_sets_table(price_col="price", days=7, set_names=None):
         style_table={"overflowX": "auto"}
     )
 
-def create_card_holdings_table(store_data, price_history_df=PRICE_HISTORY_DF):
+def create_card_holdings_table(store_data, price_history_df=None):
     """
     Build a holdings table using dcc.Store values + metadata + latest market prices.
     """
     if not store_data:
         return html.Div("No cards in collection.", style={"padding": "20px"})
 
+    if price_history_df is None:
+        price_history_df = global_variables.PRICE_HISTORY_DF
+
     df = pd.DataFrame(store_data)
 
     # --- 🔥 Merge store_data with CARD_METADATA_DF (adds name + setName) ---
-    df = df.merge(CARD_METADATA_DF[["tcgPlayerId", "name", "setName"]],
+    df = df.merge(global_variables.CARD_METADATA_DF[["tcgPlayerId", "name", "setName"]],
                   on="tcgPlayerId", how="left")
 
     # --- Latest market price from price_history_df ---
@@ -664,7 +667,7 @@ def card_view_price_history_line_chart(card_name, card_id, card_df, price_column
     return fig
 
 # ----------------- FUNCTION 5: Grade Price Comparison  -----------
-def card_view_card_grade_price_comparison(price_history_df, ebay_history_df, card_id, card_name, grading_cost=20):
+def card_view_card_grade_price_comparison(price_history_df, ebay_history_df, card_id, card_name, grading_cost=20, volume_price=None):
     """
     Compare graded vs ungraded card prices and sales volumes, and calculate ROI for grading to PSA 10.
 
@@ -674,6 +677,7 @@ def card_view_card_grade_price_comparison(price_history_df, ebay_history_df, car
     - card_id: unique identifier for the card (tcgPlayerId)
     - card_name: human-readable card name (for titles)
     - grading_cost: cost to grade a card (default $20)
+    - volume_price: precomputed calculate_cat_vol_price result, if already available
 
     Returns:
     - graded_data: filtered DataFrame of graded cards
@@ -687,7 +691,9 @@ def card_view_card_grade_price_comparison(price_history_df, ebay_history_df, car
         "PSA 10": "#2ecc71"
     }
 
-    result = calculate_cat_vol_price(price_history_df, ebay_history_df, card_id)
+    if volume_price is None:
+        volume_price = calculate_cat_vol_price(price_history_df, ebay_history_df, card_id)
+    result = volume_price
 
     if result is None:
         fig = go.Figure()
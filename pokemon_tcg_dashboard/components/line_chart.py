@@ -4,7 +4,7 @@ from plotly.subplots import make_subplots
 
 import pandas as pd
 
-from global_variables import SET_PRICE_HISTORY_DFS
+import global_variables
 
 import logging
 logger = logging.getLogger(__name__)
@@ -19,7 +19,7 @@ def create_set_line_chart(set_names:list[str]=None, days:int=-1):
     
 
 
-    sets_df = SET_PRICE_HISTORY_DFS.copy()
+    sets_df = global_variables.SET_PRICE_HISTORY_DFS.copy()
     if days > 0:
         sets_df = sets_df[sets_df.index >= (sets_df.index.max() - pd.Timedelta(days=days))]
 
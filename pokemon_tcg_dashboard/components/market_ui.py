@@ -2,11 +2,10 @@ import dash_bootstrap_components as dbc
 from dash import html, dash_table
 import pandas as pd
 from dash import dcc
-from utils.market_calcs import MarketCalculator
 from utils.loader import load_data
 from components import create_metric_card
 
-from global_variables import RARITY_OPTIONS, PRICE_HISTORY_DF, CARD_METADATA_DF
+import global_variables
 
 import logging
 logger = logging.getLogger(__name__)
@@ -22,20 +21,24 @@ def create_market_overview_metrics(days:int=1):
     # For now, use placeholder values
     logger.debug("create_market_overview_metrics called!")
     
-    price_history_df = PRICE_HISTORY_DF
-    card_metadata_df = CARD_METADATA_DF
-    market_calculator = MarketCalculator(price_history_df, card_metadata_df)
-    market_change_type = "positive" if market_calculator.calculate_change(days)['change_value'] > 0 else "negative" if market_calculator.calculate_change(days)['change_value'] < 0 else "neutral"
-    set_change_type = "positive" if market_calculator.calculate_best_performing_set(days)['change_pct'] > 0 else "negative" if market_calculator.calculate_best_performing_set(days)['change_pct'] < 0 else "neutral"
-    logger.debug(f"total_market_value: {market_calculator.calculate_total_market_value()}")
-    logger.debug(f"price_change: {market_calculator.calculate_change(days)}")
+    # Shared calculator: its snapshot and per-window results outlive this callback
+    market_calculator = global_variables.MARKET_CALCULATOR
+    total_market_value = market_calculator.calculate_total_market_value()
+    market_change = market_calculator.calculate_change(days)
+    best_set = market_calculator.calculate_best_performing_set(days)
+    active_listings = market_calculator.count_active_listings(days)
+
+    market_change_type = "positive" if market_change['change_value'] > 0 else "negative" if market_change['change_value'] < 0 else "neutral"
+    set_change_type = "positive" if best_set['change_pct'] > 0 else "negative" if best_set['change_pct'] < 0 else "neutral"
+    logger.debug(f"total_market_value: {total_market_value}")
+    logger.debug(f"price_change: {market_change}")
     label = "All time Change" if days == -1 else f"{days} Change"
     
     metrics_row = dbc.Row([
         dbc.Col(
             create_metric_card(
                 title="Total Market Value",
-                value=market_calculator.calculate_total_market_value()['formatted'],
+                value=total_market_value['formatted'],
                 #change=market_calculator.calculate_change(days)['formatted_value'],
                 change_type= market_change_type
             ),
@@ -44,8 +47,8 @@ def create_market_overview_metrics(days:int=1):
         dbc.Col(
             create_metric_card(
                 title=label,
-                value=market_calculator.calculate_change(days)['formatted_pct'],
-                change=market_calculator.calculate_change(days)['formatted_value'],
+                value=market_change['formatted_pct'],
+                change=market_change['formatted_value'],
                 change_type=market_change_type
             ),
             width=12, md=6, lg=3, className="mb-3"
@@ -53,8 +56,8 @@ def create_market_overview_metrics(days:int=1):
         dbc.Col(
             create_metric_card(
                 title="Best Performing Set",
-                value=market_calculator.calculate_best_performing_set(days)['set_name'],
-                change=market_calculator.calculate_best_performing_set(days)['formatted'],
+                value=best_set['set_name'],
+                change=best_set['formatted'],
                 change_type=set_change_type
             ),
             width=12, md=6, lg=3, className="mb-3"
@@ -62,7 +65,7 @@ def create_market_overview_metrics(days:int=1):
         dbc.Col(
             create_metric_card(
                 title="Active Listings",
-                value=market_calculator.count_active_listings(days)['formatted'],
+                value=active_listings['formatted'],
                 #change="+342",
                 #change_type="neutral"
             ),
@@ -119,7 +122,7 @@ def create_market_filters():
         dbc.Col([
             dcc.Dropdown(
                 id="market-rarity-select",
-                options=RARITY_OPTIONS,
+                options=global_variables.RARITY_OPTIONS,
                 #value="all",
                 placeholder="Filter by Rarity",
                 multi=True,
@@ -3,7 +3,7 @@ from dash import html, dash_table
 from components import create_metric_card 
 
 from utils.portfolio_calcs import PortfolioCalculator
-from global_variables import PRICE_HISTORY_DF, CARD_METADATA_DF
+import global_variables
 
 import logging
 logger = logging.getLogger(__name__)
@@ -28,7 +28,7 @@ def create_portfolio_summary_metrics(selected_cards=None,days=1):
         "neutral": "neutral"
     }
     
-    portfolio_calculator = PortfolioCalculator(selected_cards, PRICE_HISTORY_DF, CARD_METADATA_DF)
+    portfolio_calculator = PortfolioCalculator(selected_cards, global_variables.PRICE_HISTORY_DF, global_variables.CARD_METADATA_DF)
     totals = portfolio_calculator.calculate_total_portfolio_value(days)
     gain_loss = portfolio_calculator.calculate_total_gain_loss(days)
     portfolio_change_type = "positive" if totals['value_change'] > 0 else "negative" if totals['value_change'] < 0 else "neutral"
@@ -137,7 +137,7 @@ def create_risk_indicators(selected_cards=None):
         dbc.Row with 3 risk badges
     """
 
-    portfolio_calculator = PortfolioCalculator(selected_cards, PRICE_HISTORY_DF, CARD_METADATA_DF)
+    portfolio_calculator = PortfolioCalculator(selected_cards, global_variables.PRICE_HISTORY_DF, global_variables.CARD_METADATA_DF)
     diversity = portfolio_calculator.calculate_diversity_score()
     volatility = portfolio_calculator.calculate_volatility_rating()
     market_exp = portfolio_calculator.calculate_market_exposure()
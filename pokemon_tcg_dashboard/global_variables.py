@@ -1,27 +1,110 @@
-from utils import load_data, get_set_price_history
+from utils import load_data, get_set_price_history, split_variant_prices
 from utils.card_data import CardDataFetcher
+from utils.market_calcs import MarketCalculator
+from utils.catalogue import CatalogueIndex
+from utils.asof import AsOfPriceIndex
+from utils.price_panel import PricePanel
+from utils.variant_prices import VariantPriceTable
+from utils.metadata import MetadataRepository
+from utils.datasets import DatasetRegistry
 import pandas as pd
 
-PRICE_HISTORY_DF = load_data("price_history.csv", parse_dates=['date'])
-CARD_METADATA_DF = load_data("cards_metadata_table.csv")
-EBAY_METADATA_DF = load_data("ebay_price_history.csv", parse_dates=["date"])
-MAP_LOCATIONS_DF = load_data("pokemon_tcg_stores.csv")
-RELEASE_DATE_DF = load_data("set_release_date.csv", parse_dates=["release_date"])
+# Datasets load on first access (e.g. `global_variables.PRICE_HISTORY_DF`),
+# so importing this module is cheap and unused datasets never load.
+DATASETS = DatasetRegistry()
 
-MAP_LOCATIONS_DF.reset_index(inplace=True)
-RELEASE_DATE_DF.reset_index(inplace=True)
+FALLBACK_IMAGE = "/assets/no_image_available.jpg"
 
-EBAY_METADATA_DF["date"] = EBAY_METADATA_DF["date"].dt.date
-RELEASE_DATE_DF["release_date"] = RELEASE_DATE_DF["release_date"].dt.date
 
-PRICE_HISTORY_DF["date"] = pd.to_datetime(PRICE_HISTORY_DF["date"], errors="coerce").dt.tz_localize(None)
-EBAY_METADATA_DF["date"] = pd.to_datetime(EBAY_METADATA_DF["date"], errors="coerce").dt.tz_localize(None)
-RELEASE_DATE_DF["release_date"] = pd.to_datetime(RELEASE_DATE_DF["release_date"], errors="coerce").dt.tz_localize(None)
+# -------------------- RAW DATA --------------------
+@DATASETS.register("PRICE_HISTORY_DF", projectable=True)
+def _price_history(columns=None, filters=None):
+    return load_data("price_history.csv", parse_dates=['date'], compact=True, columns=columns, filters=filters)
 
-CARD_DATA_FETCHER = CardDataFetcher(CARD_METADATA_DF, PRICE_HISTORY_DF, EBAY_METADATA_DF)
+def _split_card_metadata(columns=None, filters=None):
+    # The wide prices.variants.* block lives on as VARIANT_PRICES instead.
+    return split_variant_prices(load_data("cards_metadata_table.csv", compact=True, columns=columns, filters=filters))
 
-SET_PRICE_HISTORY_DFS = get_set_price_history()
-SET_OPTIONS = sorted(CARD_METADATA_DF["setName"].dropna().unique())
-RARITY_OPTIONS = sorted(CARD_METADATA_DF["rarity"].dropna().unique())
+# The full metadata file is read and split once; both halves come from here.
+@DATASETS.register("_CARD_METADATA_SPLIT")
+def _card_metadata_split():
+    return _split_card_metadata()
 
-FALLBACK_IMAGE = "/assets/no_image_available.jpg"
\ No newline at end of file
+@DATASETS.register("CARD_METADATA_DF", projectable=True)
+def _card_metadata(columns=None, filters=None):
+    if columns is None and not filters:
+        return DATASETS.get("_CARD_METADATA_SPLIT")[0]
+    return _split_card_metadata(columns, filters)[0]
+
+@DATASETS.register("EBAY_METADATA_DF", projectable=True)
+def _ebay_metadata(columns=None, filters=None):
+    df = load_data("ebay_price_history.csv", parse_dates=["date"], compact=True, columns=columns, filters=filters)
+    # load_data already returns tz-naive dates; eBay dates are day-level.
+    if "date" in df.columns:
+        df["date"] = df["date"].dt.normalize()
+    return df
+
+@DATASETS.register("MAP_LOCATIONS_DF")
+def _map_locations():
+    return load_data("pokemon_tcg_stores.csv").reset_index()
+
+@DATASETS.register("RELEASE_DATE_DF")
+def _release_dates():
+    df = load_data("set_release_date.csv", parse_dates=["release_date"]).reset_index()
+    df["release_date"] = df["release_date"].dt.normalize()
+    return df
+
+@DATASETS.register("SET_PRICE_HISTORY_DFS")
+def _set_price_history():
+    return get_set_price_history()
+
+
+# -------------------- DERIVED --------------------
+@DATASETS.register("CARD_DATA_FETCHER")
+def _card_data_fetcher():
+    return CardDataFetcher(DATASETS.get("CARD_METADATA_DF"), DATASETS.get("PRICE_HISTORY_DF"), DATASETS.get("EBAY_METADATA_DF"))
+
+@DATASETS.register("MARKET_CALCULATOR")
+def _market_calculator():
+    return MarketCalculator(DATASETS.get("PRICE_HISTORY_DF"), DATASETS.get("CARD_METADATA_DF"))
+
+@DATASETS.register("METADATA_REPOSITORY")
+def _metadata_repository():
+    return MetadataRepository(DATASETS.get("CARD_METADATA_DF"))
+
+@DATASETS.register("CATALOGUE_INDEX")
+def _catalogue_index():
+    return CatalogueIndex(DATASETS.get("CARD_METADATA_DF"))
+
+@DATASETS.register("NEAR_MINT_PRICES")
+def _near_mint_prices():
+    return AsOfPriceIndex(DATASETS.get("PRICE_HISTORY_DF"), condition="Near Mint")
+
+@DATASETS.register("NEAR_MINT_PANEL")
+def _near_mint_panel():
+    return PricePanel(DATASETS.get("PRICE_HISTORY_DF"), filters={"condition": "Near Mint"})
+
+@DATASETS.register("VARIANT_PRICES")
+def _variant_prices():
+    return VariantPriceTable(DATASETS.get("_CARD_METADATA_SPLIT")[1])
+
+@DATASETS.register("SET_OPTIONS")
+def _set_options():
+    return sorted(DATASETS.get("CARD_METADATA_DF")["setName"].dropna().unique())
+
+@DATASETS.register("RARITY_OPTIONS")
+def _rarity_options():
+    return sorted(DATASETS.get("CARD_METADATA_DF")["rarity"].dropna().unique())
+
+
+def __getattr__(name):
+    if name in DATASETS:
+        return DATASETS.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + DATASETS.names())
+
+def warm_up(names=None, background=True):
+    """Load datasets (default: all) ahead of their first use; see `DatasetRegistry.warm_up`."""
+    return DATASETS.warm_up(names, background=background)
@@ -5,9 +5,8 @@ from datetime import timedelta
 from components.card_ui import create_card_header
 from components.charts import card_view_price_history_line_chart, card_view_card_grade_price_comparison
 from components import graph_container, tab_card_container
-from global_variables import CARD_DATA_FETCHER, PRICE_HISTORY_DF, EBAY_METADATA_DF
+import global_variables
 from utils.grade_analysis import create_grade_distribution_chart
-from utils import calculate_cat_vol_price, calculate_roi
 
 import logging
 logger = logging.getLogger(__name__)
@@ -127,21 +126,41 @@ def layout(card_id=None, **kwargs):
 
 
 
+# ---------------- Shared card data ----------------
+def load_card_bundle(pathname):
+    """
+    Resolve the card id in the URL to its shared page bundle.
+
+    Every callback below is triggered by the same pathname; the bundle is
+    computed once per card and cached, so they share a single filter pass.
+
+    Returns:
+        (bundle, None) on success, or (None, error message).
+    """
+    card_number = pathname.split("/")[-1]
+    try:
+        card_id = int(card_number)
+    except ValueError:
+        return None, "Invalid Card ID"
+
+    bundle = global_variables.CARD_DATA_FETCHER.get_card_bundle(card_id)
+    if bundle is None:
+        return None, "Card Not Found"
+    return bundle, None
+
+
 # ---------------- Populate card header ----------------
 @callback(
     Output("card-header-container", "children"),
     Input("url", "pathname")
 )
 def update_card_header(pathname):
-    card_number = pathname.split("/")[-1]
-    try:
-        card_id = int(card_number)
-    except ValueError:
-        return html.H3("Invalid Card ID")
+    bundle, error = load_card_bundle(pathname)
+    if error:
+        return html.H3(error)
 
-    card_metadata = CARD_DATA_FETCHER.get_card_by_id(card_id=card_id, days = None, condition = 'any')
-    if card_metadata is None:
-        return html.H3("Card Not Found")
+    card_metadata = bundle["card"]
+    card_id = card_metadata["card_id"]
 
     card_data = {
         "name": card_metadata['name'],
@@ -170,20 +189,17 @@ def update_card_header(pathname):
     Input("url", "pathname")
 )
 def update_tcg_chart(selected_date, selected_grade, pathname):
-    card_number = pathname.split("/")[-1]
-    try:
-        card_id = int(card_number)
-    except ValueError:
-        return html.Div("Invalid Card ID")
+    bundle, error = load_card_bundle(pathname)
+    if error:
+        return html.Div(error)
 
-    card_metadata = CARD_DATA_FETCHER.get_card_by_id(card_id=card_id, days = None, condition = 'any')
-    if card_metadata is None:
-        return html.Div("Card Not Found")
+    card_metadata = bundle["card"]
+    card_id = card_metadata["card_id"]
 
     fig = card_view_price_history_line_chart(
         card_name=card_metadata["name"],
         card_id=card_id,
-        card_df=PRICE_HISTORY_DF,
+        card_df=bundle["tcg_history"],
         price_column="market",
         platform_name="Ungraded",
         grade_filter="condition",
@@ -201,20 +217,17 @@ def update_tcg_chart(selected_date, selected_grade, pathname):
     Input("url", "pathname")
 )
 def update_ebay_chart(selected_date, selected_grade, pathname):
-    card_number = pathname.split("/")[-1]
-    try:
-        card_id = int(card_number)
-    except ValueError:
-        return html.Div("Invalid Card ID")
+    bundle, error = load_card_bundle(pathname)
+    if error:
+        return html.Div(error)
 
-    card_metadata = CARD_DATA_FETCHER.get_card_by_id(card_id=card_id, days = None, condition = 'any')
-    if card_metadata is None:
-        return html.Div("Card Not Found")
+    card_metadata = bundle["card"]
+    card_id = card_metadata["card_id"]
 
     fig = card_view_price_history_line_chart(
         card_name=card_metadata["name"],
         card_id=card_id,
-        card_df=EBAY_METADATA_DF,
+        card_df=bundle["ebay_history"],
         price_column="average",
         platform_name="Graded",
         grade_filter="grade",
@@ -229,22 +242,17 @@ def update_ebay_chart(selected_date, selected_grade, pathname):
     Input("url", "pathname")
 )
 def update_grade_chart(pathname):
-    card_number = pathname.split("/")[-1]
-    try:
-        card_id = int(card_number)
-    except ValueError:
-        return html.Div("Invalid Card ID")
+    bundle, error = load_card_bundle(pathname)
+    if error:
+        return html.Div(error)
 
-    card_metadata = CARD_DATA_FETCHER.get_card_by_id(card_id=card_id, days=None, condition='any')
-    if card_metadata is None:
-        return html.Div("Card Not Found")
+    card_metadata = bundle["card"]
+    card_id = card_metadata["card_id"]
 
     #print(card_metadata["name"])
 
-    grade_df = EBAY_METADATA_DF
-    
     fig = create_grade_distribution_chart(
-        data=grade_df,
+        data=bundle["ebay_history"],
         card_id=card_id,
         card_name=card_metadata["name"]
     )
@@ -256,23 +264,21 @@ def update_grade_chart(pathname):
     Input("url", "pathname")
 )
 def update_grade_comparison_chart(pathname):
-    card_number = pathname.split("/")[-1]
-    try:
-        card_id = int(card_number)
-    except ValueError:
-        return html.Div("Invalid Card ID")
+    bundle, error = load_card_bundle(pathname)
+    if error:
+        return html.Div(error)
 
-    card_metadata = CARD_DATA_FETCHER.get_card_by_id(card_id=card_id, days=None, condition='any')
-    if card_metadata is None:
-        return html.Div("Card Not Found")
+    card_metadata = bundle["card"]
+    card_id = card_metadata["card_id"]
 
     #print(card_metadata["name"])
     
     fig = card_view_card_grade_price_comparison(
-        price_history_df = PRICE_HISTORY_DF,
-        ebay_history_df = EBAY_METADATA_DF,
+        price_history_df = bundle["tcg_history"],
+        ebay_history_df = bundle["ebay_history"],
         card_id=card_id,
-        card_name=card_metadata["name"]
+        card_name=card_metadata["name"],
+        volume_price=bundle["volume_price"]
     )
     return graph_container(fig=fig, title = 'Ungraded vs Graded Comparison')
 
@@ -282,24 +288,16 @@ def update_grade_comparison_chart(pathname):
 )
 def update_roi_annotations(pathname):
     logger.debug("update_roi_annotations called")
-    card_number = pathname.split("/")[-1]
-    try:
-        card_id = int(card_number)
-    except ValueError:
-        return html.Div("Invalid Card ID")
+    bundle, error = load_card_bundle(pathname)
+    if error:
+        return html.Div(error)
 
-    card_metadata = CARD_DATA_FETCHER.get_card_by_id(card_id=card_id, days=None, condition='any')
-    if card_metadata is None:
-        return html.Div("Card Not Found")
+    card_metadata = bundle["card"]
+    card_id = card_metadata["card_id"]
 
     #print(card_metadata["name"])
     
-    results = calculate_roi(
-        price_history_df = PRICE_HISTORY_DF,
-        ebay_history_df = EBAY_METADATA_DF,
-        card_id=card_id,
-        #card_name=card_metadata["name"],
-    )
+    results = bundle["roi"]
     logger.debug("==============================================================")
     logger.debug(f"ROI Results: {results}")
 
@@ -7,7 +7,8 @@ from datetime import date
 import logging
 logger = logging.getLogger(__name__)
 
-from global_variables import PRICE_HISTORY_DF, CARD_METADATA_DF, SET_OPTIONS, RARITY_OPTIONS, FALLBACK_IMAGE
+import global_variables
+from global_variables import FALLBACK_IMAGE
 
 dash.register_page(
     __name__,
@@ -31,21 +32,6 @@ clear_button = dbc.Button("Clear Selected Cards",
                           color="light", 
                           class_name="me-1")
 
-# Dropdowns
-set_select = dcc.Dropdown(
-    id="set-select",
-    options=SET_OPTIONS,
-    multi=True,
-    placeholder="Filter By Set"
-)
-
-rarity_select = dcc.Dropdown(
-    id="rarity-select",
-    options=RARITY_OPTIONS,
-    multi=True,
-    placeholder="Filter By Rarity"
-)
-
 # Offcanvas
 offcanvas = html.Div([
     dbc.Offcanvas(
@@ -167,60 +153,63 @@ offcanvas = html.Div([
     )
 ])
 
-# Layout
-layout = html.Div([
-    dcc.Store(id="page-number", data=0),
-    dcc.Store(id="offcanvas-unit-price", data=0),
-    dcc.Store(id="offcanvas-tcgplayerid", data=None),
-    offcanvas,
-    dbc.Stack([
-        html.Div([
-            dbc.Row([
-                dbc.Col([search_bar]),
-                dbc.Col([clear_button]),
-            ], justify="between")
-        ], style={"margin-bottom": "15px"}),
-        html.Div([
-            dbc.Row([
-                dbc.Col(set_select),
-                dbc.Col(rarity_select)
-            ])  
-        ], style={"margin-bottom": "15px"}),
-        html.Div([
-            dbc.ButtonGroup([
-                dbc.Button("Prev", id="page-prev", color="light"),
-                dbc.Button("Next", id="page-next", color="light"),
-            ]),
-            html.Span(id="page-label", style={"marginLeft": "10px"})
-        ], style={"marginBottom": "10px"}),
-        html.Div(
-            id="image-grid",
-            style={
-                "display": "grid",
-                "gridTemplateColumns": "repeat(auto-fill, minmax(200px, 1fr))",
-                "gap": "16px"
-            }
-        )
+# Layout (built per request, so the card metadata loads on first visit)
+def layout(**kwargs):
+    # Dropdowns
+    set_select = dcc.Dropdown(
+        id="set-select",
+        options=global_variables.SET_OPTIONS,
+        multi=True,
+        placeholder="Filter By Set"
+    )
+
+    rarity_select = dcc.Dropdown(
+        id="rarity-select",
+        options=global_variables.RARITY_OPTIONS,
+        multi=True,
+        placeholder="Filter By Rarity"
+    )
+
+    return html.Div([
+        dcc.Store(id="page-number", data=0),
+        dcc.Store(id="offcanvas-unit-price", data=0),
+        dcc.Store(id="offcanvas-tcgplayerid", data=None),
+        offcanvas,
+        dbc.Stack([
+            html.Div([
+                dbc.Row([
+                    dbc.Col([search_bar]),
+                    dbc.Col([clear_button]),
+                ], justify="between")
+            ], style={"margin-bottom": "15px"}),
+            html.Div([
+                dbc.Row([
+                    dbc.Col(set_select),
+                    dbc.Col(rarity_select)
+                ])  
+            ], style={"margin-bottom": "15px"}),
+            html.Div([
+                dbc.ButtonGroup([
+                    dbc.Button("Prev", id="page-prev", color="light"),
+                    dbc.Button("Next", id="page-next", color="light"),
+                ]),
+                html.Span(id="page-label", style={"marginLeft": "10px"})
+            ], style={"marginBottom": "10px"}),
+            html.Div(
+                id="image-grid",
+                style={
+                    "display": "grid",
+                    "gridTemplateColumns": "repeat(auto-fill, minmax(200px, 1fr))",
+                    "gap": "16px"
+                }
+            )
+        ])
     ])
-])
 
 # ----------------------
 # Callbacks
 # ----------------------
 
-@callback(
-    Output("set-select", "options"),
-    Output("rarity-select", "options"),
-    Input("cards-metadata", "data")
-)
-def update_dropdowns(data):
-    if not data:
-        return [], []
-    df = pd.DataFrame(data)
-    set_options = sorted(df["setName"].dropna().unique())
-    rarity_options = sorted(df["rarity"].dropna().unique())
-    return set_options, rarity_options
-
 @callback(
     Output("page-number", "data"),
     Output("page-label", "children"),
@@ -238,19 +227,7 @@ def change_page(prev, next_, current_page, selected_sets, selected_types, search
     next_ = next_ or 0
     trigger = ctx.triggered_id
     current_page = int(current_page or 0)
-    image_df = CARD_METADATA_DF
-    filtered = image_df.copy()
-    if selected_sets:
-        filtered = filtered[filtered["setName"].isin(selected_sets)]
-    if selected_types:
-        filtered = filtered[filtered["rarity"].isin(selected_types)]
-    if searched_text:
-        mask = filtered.apply(
-            lambda row: row.astype(str).str.contains(searched_text, case=False).any(),
-            axis=1
-        )
-        filtered = filtered[mask]
-    total_cards = len(filtered)
+    total_cards = int(global_variables.CATALOGUE_INDEX.filter_mask(selected_sets, selected_types, searched_text).sum())
     total_pages = max(1, (total_cards + CARDS_PER_PAGE - 1) // CARDS_PER_PAGE)
     if trigger == "page-prev" and current_page > 0:
         current_page -= 1
@@ -271,25 +248,14 @@ def change_page(prev, next_, current_page, selected_sets, selected_types, search
     Input("rarity-select", "value"),
     Input("card_search","value"),
     Input("page-number", "data"),
-    State("cards-metadata", "data")
 )
-def update_images(selected_sets, selected_types, searched_text,page, cards_metadata):
+def update_images(selected_sets, selected_types, searched_text,page):
     page = int(page or 0)
-    image_df = pd.DataFrame(cards_metadata)
-    filtered = image_df.copy()
-    if selected_sets:
-        filtered = filtered[filtered["setName"].isin(selected_sets)]
-    if selected_types:
-        filtered = filtered[filtered["rarity"].isin(selected_types)]
-    if searched_text:
-        search_mask = filtered.apply(lambda row: row.astype(str).str.contains(searched_text, case=False).any(), axis=1)
-        filtered = filtered[search_mask]
-    start = page * CARDS_PER_PAGE
-    end = start + CARDS_PER_PAGE
-    filtered = filtered.iloc[start:end]
+    # Only the current page's cards (and only the grid's columns) leave the server
+    page_df, _ = global_variables.CATALOGUE_INDEX.page(page, CARDS_PER_PAGE, selected_sets, selected_types, searched_text)
     cards = []
-    for _, row in filtered.iterrows():
-        image_url = row["imageUrl"] if row["imageUrl"] else FALLBACK_IMAGE
+    for row in page_df.to_dict("records"):
+        image_url = row["imageUrl"] if pd.notna(row["imageUrl"]) and row["imageUrl"] else FALLBACK_IMAGE
         cards.append(
             html.Div(
                 dbc.Card(
@@ -406,7 +372,7 @@ def handle_offcanvas(
 
     qty = qty or 0
     selected_cards = selected_cards or []
-    card_data = CARD_METADATA_DF
+    metadata = global_variables.METADATA_REPOSITORY
     
     #clear portfolio
     if trigger == "clear-portfolio":
@@ -419,13 +385,12 @@ def handle_offcanvas(
             []  # clears selected-cards
         )
 
-    # Convert card metadata to DataFrame
-    df = pd.DataFrame(card_data).set_index("tcgPlayerId")
-
     # open offcanvas for add to portfolio button
     if isinstance(trigger, dict) and trigger.get("type") == "add-portfolio-button":
         card_id = trigger["index"]
-        row = df.loc[card_id]
+        row = metadata.get(card_id)
+        if row is None:
+            raise exceptions.PreventUpdate
         image_url = row["imageUrl"] if pd.notna(row["imageUrl"]) else FALLBACK_IMAGE
 
         unit_price = float(row["prices.market"])
@@ -461,8 +426,8 @@ def handle_offcanvas(
                 existing_index = next((i for i, c in enumerate(selected_cards) if c["tcgPlayerId"] == stored_id), None)
                 card_entry = {
                     "tcgPlayerId": int(stored_id),
-                    "name": df.loc[stored_id,"name"],
-                    "set_name": df.loc[stored_id,"setName"],
+                    "name": metadata.value(stored_id, "name"),
+                    "set_name": metadata.value(stored_id, "setName"),
                     "quantity": qty,
                     "buy_price": float(offcanvas_unit_price.replace("$", "").replace(",", "")),
                     "buy_date": selected_date
@@ -538,16 +503,12 @@ def update_offcanvas_price(selected_date, stored_unit_price, stored_id, qty):
         unit_price = unit_price.iloc[0]
 
     current_price = unit_price
-    card_prices = PRICE_HISTORY_DF.copy()
-    card_prices = card_prices.set_index('date')
-    card_prices = card_prices[card_prices['condition'] == 'Near Mint']
-    mask = card_prices["tcgPlayerId"] == card_id
-    day_prices = card_prices[mask]
-    logger.debug(f"selected_date in day_prices.index: {selected_date in day_prices.index}")
-    if selected_date in day_prices.index:
-        unit_price = day_prices.loc[selected_date, "market"]
-        logger.debug(day_prices.loc[selected_date])
-        logger.debug(f"updated unit price based on date picker: {unit_price}")
+    # Near Mint price on (or last known before) the picked date
+    if card_id is not None and selected_date:
+        price_on_date = global_variables.NEAR_MINT_PRICES.lookup([card_id], selected_date)[0]
+        if not pd.isna(price_on_date):
+            unit_price = price_on_date
+            logger.debug(f"updated unit price based on date picker: {unit_price}")
 
     total_price = int(qty) * float(unit_price)
     logger.debug(f"unit_price: {unit_price}, total_price: {total_price}")
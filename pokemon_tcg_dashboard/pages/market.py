@@ -9,8 +9,7 @@ from components import ban_card_container, graph_container, create_set_line_char
 from components.market_ui import create_market_overview_metrics, create_market_filters, create_top_movers_table, create_set_release_date_table
 from components.charts import market_view_set_performance_bar_chart, create_top_sets_table
 from utils.lgs_map import create_spatial_map
-from global_variables import MAP_LOCATIONS_DF, RELEASE_DATE_DF, CARD_METADATA_DF
-from global_variables import SET_OPTIONS
+import global_variables
 
 from utils import calculate_top_movers
 
@@ -22,118 +21,120 @@ dash.register_page(__name__, path="/",
                     name="Market",
                     order=1)
 
-market_set_filter = dbc.Row(
-    [
-        # Time range select
-        dbc.Col(
-            dbc.Select(
-                id="select-market",
-                options=[
-                    {"label": "24 Hours", "value": 1},
-                    {"label": "7 Days", "value": 7},
-                    {"label": "1 Month", "value": 30},
-                    {"label": "3 Months", "value": 90},
-                    {"label": "1 Year", "value": 365},
-                    {"label": "All Time", "value": -1},
-                ],
-                value=30
+# Layout (built per request, so the market data loads on first visit)
+def layout(**kwargs):
+    market_set_filter = dbc.Row(
+        [
+            # Time range select
+            dbc.Col(
+                dbc.Select(
+                    id="select-market",
+                    options=[
+                        {"label": "24 Hours", "value": 1},
+                        {"label": "7 Days", "value": 7},
+                        {"label": "1 Month", "value": 30},
+                        {"label": "3 Months", "value": 90},
+                        {"label": "1 Year", "value": 365},
+                        {"label": "All Time", "value": -1},
+                    ],
+                    value=30
+                ),
+                width=4
             ),
-            width=4
-        ),
-
-        # Set filter dropdown
-        dbc.Col(
-            dcc.Dropdown(
-                id="market-set-select",
-                options=SET_OPTIONS,
-                multi=True,
-                placeholder="Filter by Set",
-                clearable=False,
-                style={"borderRadius": "5px"}
+
+            # Set filter dropdown
+            dbc.Col(
+                dcc.Dropdown(
+                    id="market-set-select",
+                    options=global_variables.SET_OPTIONS,
+                    multi=True,
+                    placeholder="Filter by Set",
+                    clearable=False,
+                    style={"borderRadius": "5px"}
+                ),
+                width=4
             ),
-            width=4
-        ),
 
-        # Clear button
+            # Clear button
+            dbc.Col([
+                dbc.Button(
+                    "Clear Filters",
+                    id="clear-filters-btn",
+                    color="secondary",
+                    outline=True,
+                    className="w-100"
+                )
+            ], width=4)
+        ]
+    )
+
+    ban_row = html.Div(
+        create_market_overview_metrics(days=-1),
+        id="market-overview-metrics-row")
+
+    map_row = dbc.Row([
         dbc.Col([
-            dbc.Button(
-                "Clear Filters",
-                id="clear-filters-btn",
-                color="secondary",
-                outline=True,
-                className="w-100"
+            html.H4("Pokémon Store Locations", className="mb-3"),
+            dcc.Graph(
+                id="pokemon-store-map",
+                figure=create_spatial_map(global_variables.MAP_LOCATIONS_DF),
+                style={'height': '500px', 'width': '100%'},
+                config={'scrollZoom': True} 
             )
-        ], width=4)
-    ]
-)
+        ], width=7, style={'height': '500px', 'display': 'flex', 'flexDirection': 'column'}),
 
-ban_row = html.Div(
-    create_market_overview_metrics(days=-1),
-    id="market-overview-metrics-row")
-
-map_row = dbc.Row([
-    dbc.Col([
-        html.H4("Pokémon Store Locations", className="mb-3"),
-        dcc.Graph(
-            id="pokemon-store-map",
-            figure=create_spatial_map(MAP_LOCATIONS_DF),
-            style={'height': '500px', 'width': '100%'},
-            config={'scrollZoom': True} 
-        )
-    ], width=7, style={'height': '500px', 'display': 'flex', 'flexDirection': 'column'}),
-
-    dbc.Col([
-        html.H4("Set Release Dates", className="mb-3"),
-        html.Div(
-            create_set_release_date_table(RELEASE_DATE_DF),
-            style={'flex': '1', 'display': 'flex', 'flexDirection': 'column', 'height': '100%'}
+        dbc.Col([
+            html.H4("Set Release Dates", className="mb-3"),
+            html.Div(
+                create_set_release_date_table(global_variables.RELEASE_DATE_DF),
+                style={'flex': '1', 'display': 'flex', 'flexDirection': 'column', 'height': '100%'}
+            )
+        ], width=5, style={'display': 'flex', 'flexDirection': 'column', 'height': '100%'})
+    ],
+    className="g-3",
+    style={'alignItems': 'stretch'})
+
+    return html.Div([
+        dbc.Stack(
+            [
+                ban_row,
+                dbc.Row([market_set_filter]),
+                html.Hr(),
+                dbc.Row([
+                    graph_container(
+                        fig=create_set_line_chart(),
+                        fig_id="set-performance-list",
+                        title="Set Performance Overview"
+                    ),
+                ]),
+                html.Hr(),
+                dbc.Row([
+                    # html.H4("Top Price Movers", className="mb-3"),
+                    # create_top_movers_table(),
+                    table_container(
+                        table="",
+                        title="Set Price Movements",
+                        #fig_id="top-movers-table-fig",
+                        container_id="top-movers-table-fig"
+                    )
+                ], id="top-movers-row"),
+                html.Hr(),
+                dbc.Row([create_market_filters()]),
+                html.Hr(),
+                dbc.Row([
+                    table_container(
+                        table="",
+                        title="Top Price Movers (Cards)",
+                        #class_name="top-movers-card-table-fig",
+                        container_id="top-movers-card-table-fig"
+                    )
+                ]),
+                html.Hr(),
+                map_row,
+                html.Hr()
+            ],
         )
-    ], width=5, style={'display': 'flex', 'flexDirection': 'column', 'height': '100%'})
-],
-className="g-3",
-style={'alignItems': 'stretch'})
-
-layout = html.Div([
-    dbc.Stack(
-        [
-            ban_row,
-            dbc.Row([market_set_filter]),
-            html.Hr(),
-            dbc.Row([
-                graph_container(
-                    fig=create_set_line_chart(),
-                    fig_id="set-performance-list",
-                    title="Set Performance Overview"
-                ),
-            ]),
-            html.Hr(),
-            dbc.Row([
-                # html.H4("Top Price Movers", className="mb-3"),
-                # create_top_movers_table(),
-                table_container(
-                    table="",
-                    title="Set Price Movements",
-                    #fig_id="top-movers-table-fig",
-                    container_id="top-movers-table-fig"
-                )
-            ], id="top-movers-row"),
-            html.Hr(),
-            dbc.Row([create_market_filters()]),
-            html.Hr(),
-            dbc.Row([
-                table_container(
-                    table="",
-                    title="Top Price Movers (Cards)",
-                    #class_name="top-movers-card-table-fig",
-                    container_id="top-movers-card-table-fig"
-                )
-            ]),
-            html.Hr(),
-            map_row,
-            html.Hr()
-        ],
-    )
-])
+    ])
 
 #logger.info("Market page layout constructed")
 
@@ -227,5 +228,5 @@ def display_click(active_cell, table_data):
     if active_cell:
         if active_cell['column_id'] == 'name':
             card_name = table_data[active_cell['row']][active_cell['column_id']]
-            card_tcgplayerid = CARD_METADATA_DF.loc[CARD_METADATA_DF['name'] == card_name, "tcgPlayerId"].values[0]
+            card_tcgplayerid = global_variables.CARD_METADATA_DF.loc[global_variables.CARD_METADATA_DF['name'] == card_name, "tcgPlayerId"].values[0]
             return f"card/{card_tcgplayerid}"
@@ -8,7 +8,7 @@ from utils import get_image_urls, calculate_holdings_price_change
 from components import ban_card_container, graph_container, tab_card_container, table_container, portfolio_view_collection_pie_chart
 from components.portfolio_ui import create_portfolio_summary_metrics, create_risk_indicators, create_holdings_table
 
-from global_variables import PRICE_HISTORY_DF, CARD_METADATA_DF, FALLBACK_IMAGE
+from global_variables import FALLBACK_IMAGE
 
 import logging
 logger = logging.getLogger(__name__)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app imports its modules from its own directory (`import global_variables`,
+# `from utils import ...`), so tests do the same.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,33 @@
+from utils.cache import TTLCache, get_cache_stats, memoized_method
+
+
+class _Fetcher:
+    data_version = 0
+
+    @memoized_method(maxsize=4)
+    def double(self, value):
+        return value * 2
+
+
+def test_caches_sharing_a_name_are_all_reported():
+    first = TTLCache(maxsize=4, name="test_shared")
+    second = TTLCache(maxsize=4, name="test_shared")
+    first.set("a", 1)
+
+    stats = get_cache_stats()
+    shared = {name: s for name, s in stats.items() if name.startswith("test_shared")}
+    assert shared == {
+        f"test_shared#{first.serial}": first.stats(),
+        f"test_shared#{second.serial}": second.stats(),
+    }
+
+    del second
+    assert get_cache_stats()["test_shared"]["size"] == 1
+
+
+def test_memoized_method_caches_are_per_instance():
+    a, b = _Fetcher(), _Fetcher()
+    assert a.double(2) == 4 and b.double(3) == 6
+
+    names = [name for name in get_cache_stats() if name.startswith("_Fetcher.double")]
+    assert len(names) == 2
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.trading_signals import (
+    _backtest_signals,
+    _backtest_window,
+    backtest_portfolio,
+    generate_trading_signal,
+    generate_trading_signal_simple,
+    screen_trading_signals,
+    sweep_trading_signals,
+)
+
+
+def _daily_series(prices, start="2024-01-01", skip=()):
+    """Daily price series with the given prices, leaving out the `skip` day offsets."""
+    days = pd.date_range(start, periods=len(prices) + len(skip), freq="D")
+    days = days[[i for i in range(len(days)) if i not in set(skip)]]
+    return pd.Series(np.asarray(prices, dtype=float), index=days)
+
+
+def _reference_signals(daily_all, lookback_days):
+    """Signal of generate_trading_signal_simple on each day's history, as the backtester used to compute it."""
+    days = list(daily_all.index)
+    signals = []
+    for i in range(lookback_days, len(days)):
+        hist_df = pd.DataFrame({"date": days[:i], "price": daily_all.iloc[:i].to_numpy()})
+        hist_df["card_id"] = 1
+        signals.append(generate_trading_signal_simple(1, hist_df, lookback_days=lookback_days)["signal"])
+    return signals
+
+
+def _random_walk(seed, n):
+    rng = np.random.default_rng(seed)
+    return np.round(10 * np.exp(np.cumsum(rng.normal(0, 0.04, n))), 2)
+
+
+def _step_walk(seed, n):
+    """Prices moving in 10-cent steps: MAs and thresholds are often tied."""
+    rng = np.random.default_rng(seed)
+    return np.round(5 + np.cumsum(rng.choice([-0.1, 0, 0, 0.1], n)), 2)
+
+
+SERIES = {
+    "random walk": _daily_series(_random_walk(0, 160)),
+    "random walk with gaps": _daily_series(_random_walk(1, 150), skip=(20, 21, 22, 60, 90, 91)),
+    # Flat stretches: price equals both MAs exactly and the slope is 0
+    "flat stretches": _daily_series(np.concatenate([
+        _random_walk(2, 40), np.full(30, 12.5), _random_walk(3, 40), np.full(25, 3.1),
+    ])),
+    # Period-3 cycle: price sits exactly on its 15-day MA every third day
+    "period 3": _daily_series(np.tile([1.1, 2.2, 3.3], 40)),
+    # Period-5 cycle: both MAs equal the mean and the price every fifth day
+    "period 5": _daily_series(np.tile([0.7, 1.4, 2.1, 2.8, 3.5], 24)),
+}
+
+
+@pytest.mark.parametrize("lookback_days", [10, 30])
+@pytest.mark.parametrize("name", list(SERIES))
+def test_backtest_signals_match_per_day_signals(name, lookback_days):
+    daily_all = SERIES[name]
+    expected = _reference_signals(daily_all, lookback_days)
+    assert list(_backtest_signals(daily_all, lookback_days)) == expected
+
+
+def test_backtest_window_keeps_file_order_for_same_day_rows():
+    dates = pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-02", "2024-01-03"])
+    dfc = pd.DataFrame({"date": dates, "price": [1.0, 2.0, 5.0, 3.0, 4.0]})
+    daily = _backtest_window(dfc, "2024-01-01", "2024-01-31", lookback_days=0)
+    assert daily.tolist() == [1.0, 3.0, 4.0]
+
+
+def _price_history(series_by_card):
+    frames = [
+        pd.DataFrame({"card_id": card_id, "date": daily.index, "price": daily.to_numpy()})
+        for card_id, daily in series_by_card.items()
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_sweep_default_combination_matches_backtest_portfolio():
+    series_by_card = {i: _daily_series(_random_walk(10 + i, 120)) for i in range(12)}
+    series_by_card.update({100 + i: _daily_series(_step_walk(i, 90)) for i in range(20)})
+    price_history = _price_history(series_by_card)
+    card_ids = list(series_by_card)
+
+    portfolio = backtest_portfolio(card_ids, price_history, "2024-01-01", "2024-12-31", max_workers=1)
+    sweep = sweep_trading_signals(card_ids, price_history, "2024-01-01", "2024-12-31",
+                                  {"rsi_oversold": [25, 30]}, max_workers=1)
+    default = sweep[sweep["rsi_oversold"] == 30].iloc[0]
+
+    assert default["cards"] == len(portfolio["results"])
+    assert default["num_trades"] == portfolio["num_trades"]
+    assert default["closed_trades"] == portfolio["closed_trades"]
+    assert default["win_rate_pct"] == pytest.approx(portfolio["win_rate_pct"])
+    assert default["total_return_pct"] == pytest.approx(portfolio["total_return_pct"])
+
+
+def _screener_history(n_cards=200, seed=3):
+    """Cards with varied lengths, gaps, end dates and several rows on some days."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for card_id in range(n_cards):
+        if card_id % 20:
+            n_days = int(rng.integers(2, 150))
+            days = np.sort(rng.choice(n_days + 30, n_days, replace=False)) + int(rng.integers(0, 60))
+        else:
+            # Under 5 days of prices
+            n_days = int(rng.integers(1, 5))
+            days = np.arange(n_days) + int(rng.integers(0, 60))
+        if card_id % 5 == 0:
+            prices = np.round(5 + np.cumsum(rng.choice([-0.1, 0, 0, 0.1], n_days)), 2)
+        else:
+            prices = _random_walk(1000 + card_id, n_days)
+        dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D")
+        frame = pd.DataFrame({"card_id": card_id, "date": dates, "price": prices})
+        # A second, later row on some days
+        extra = frame.sample(frac=0.1, random_state=card_id)
+        extra = extra.assign(date=extra["date"] + pd.Timedelta(hours=12),
+                             price=np.round(extra["price"] * 1.05, 2))
+        frames += [frame, extra]
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("lookback_days", [30, 90])
+def test_screener_matches_generate_trading_signal(lookback_days):
+    price_history = _screener_history()
+    table = screen_trading_signals(price_history, lookback_days).set_index("card_id")
+    assert len(table) == price_history["card_id"].nunique()
+
+    for card_id, row in table.iterrows():
+        expected = generate_trading_signal(card_id, price_history, lookback_days)
+        assert row["signal"] == expected["signal"]
+        assert row["reason"] == expected["reason"]
+        assert row["net_score"] == expected["net_score"]
+        assert row["confidence"] == pytest.approx(expected["confidence"], rel=1e-9, abs=1e-9)
+        if not expected["indicators"]:
+            assert np.isnan(row["target_price"])
+            continue
+        assert row["target_price"] == pytest.approx(expected["target_price"], rel=1e-9)
+        for name, value in expected["indicators"].items():
+            assert row[name] == pytest.approx(value, rel=1e-9, abs=1e-12, nan_ok=True), name
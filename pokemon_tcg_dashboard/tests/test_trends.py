@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.trends import TrendTable
+
+WINDOWS = (None, 30, 7)
+
+
+def _price_history():
+    rng = np.random.default_rng(7)
+    frames = []
+
+    # Daily prices, and prices on irregular days
+    for card_id, days in [(1, np.arange(60)), (2, np.sort(rng.choice(90, 25, replace=False)))]:
+        prices = np.round(10 * np.exp(np.cumsum(rng.normal(0, 0.05, len(days)))), 2)
+        frames.append(pd.DataFrame({"tcgPlayerId": card_id, "day": days, "market": prices}))
+
+    # Some missing prices, including the latest one
+    prices = np.round(5 + rng.normal(0, 0.5, 40), 2)
+    prices[[0, 3, 17, 18, 39]] = np.nan
+    frames.append(pd.DataFrame({"tcgPlayerId": 3, "day": np.arange(40), "market": prices}))
+
+    # One price; only missing prices
+    frames.append(pd.DataFrame({"tcgPlayerId": 4, "day": [10], "market": [2.5]}))
+    frames.append(pd.DataFrame({"tcgPlayerId": 5, "day": [1, 2], "market": [np.nan, np.nan]}))
+
+    df = pd.concat(frames, ignore_index=True)
+    df["date"] = pd.Timestamp("2024-01-01") + pd.to_timedelta(df.pop("day"), unit="D")
+    # Rows out of order, as in the raw file
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def _reference_stats(df, card_id, window):
+    rows = df[(df["tcgPlayerId"] == card_id) & df["market"].notna()].sort_values("date", kind="mergesort")
+    if rows.empty:
+        return None
+    if window is not None:
+        rows = rows[rows["date"] >= rows["date"].max() - pd.Timedelta(days=window - 1)]
+    y = rows["market"].to_numpy()
+    if len(y) < 2:
+        return np.nan, np.nan
+    slope = np.polyfit(np.arange(len(y)), y, 1)[0]
+    return slope, (y[-1] - y[0]) / y[0]
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+@pytest.mark.parametrize("card_id", [1, 2, 3, 4, 5, 6])
+def test_stats_match_polyfit(card_id, window):
+    df = _price_history()
+    table = TrendTable(df, windows=WINDOWS)
+
+    expected = _reference_stats(df, card_id, window)
+    actual = table.stats(card_id, window)
+    if expected is None:
+        assert actual is None
+    else:
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_trend_without_enough_data():
+    table = TrendTable(_price_history(), windows=WINDOWS)
+    assert table.trend(4) == "not enough data"
+    assert table.trend(5) == "not enough data"
+    assert table.table.loc[4, "n_all"] == 1
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Optional, Union
+
+import logging
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+
+
+class AsOfPriceIndex:
+    """
+    Answers "price of card X as of date D" for many (card, date) pairs at once.
+
+    Priced rows are sorted by (card, date) once and each row gets an integer
+    key `card_code * (n_dates + 1) + date_rank`. A query is turned into the
+    same kind of key, so the latest row on/before its date is found with a
+    single `np.searchsorted` over all queries.
+
+    Args:
+        price_history_df (pd.DataFrame): Price history with `tcgPlayerId`, `date`
+                                         and the value column.
+        value_column (str): Column holding the price. Rows where it is NaN are skipped.
+        condition (str, optional): Only index rows of this condition (e.g. "Near Mint").
+    """
+
+    def __init__(self, price_history_df: pd.DataFrame, value_column: str = "market", condition: Optional[str] = None) -> None:
+        df = price_history_df
+        if condition is not None:
+            df = df[df["condition"] == condition]
+        df = df[df[value_column].notna()].sort_values(["tcgPlayerId", "date"], kind="mergesort")
+
+        card_codes, self.card_ids = pd.factorize(df["tcgPlayerId"], sort=True)
+        self.dates = df["date"].to_numpy(dtype="datetime64[ns]")
+        self.values = df[value_column].to_numpy(dtype=float)
+
+        self._unique_dates = np.unique(self.dates)
+        self._stride = len(self._unique_dates) + 1
+        date_rank = np.searchsorted(self._unique_dates, self.dates, side="left") + 1
+        self._keys = card_codes.astype(np.int64) * self._stride + date_rank
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def lookup(self, card_ids: Iterable[Any], dates: Optional[Union[DateLike, Iterable[DateLike]]] = None,
+               min_date: Optional[DateLike] = None) -> np.ndarray:
+        """
+        Latest price of each card on or before its query date.
+
+        Args:
+            card_ids: tcgPlayerIds to look up.
+            dates: One date per card, a single date for all cards, or None for
+                   the latest price available.
+            min_date: Prices dated before this are treated as missing.
+
+        Returns:
+            np.ndarray: One price per query; NaN where the card has no price in range.
+        """
+        card_ids = np.asarray(list(card_ids))
+        result = np.full(len(card_ids), np.nan)
+        if not len(card_ids) or not len(self.values):
+            return result
+
+        codes = self.card_ids.get_indexer(card_ids)
+
+        if dates is None:
+            date_rank = np.full(len(card_ids), self._stride - 1)
+        else:
+            query_dates = pd.to_datetime(dates if np.ndim(dates) else [dates] * len(card_ids))
+            query_dates = np.asarray(query_dates.tz_localize(None) if query_dates.tz else query_dates, dtype="datetime64[ns]")
+            date_rank = np.searchsorted(self._unique_dates, query_dates, side="right")
+
+        query_keys = codes.astype(np.int64) * self._stride + date_rank
+        pos = np.searchsorted(self._keys, query_keys, side="right") - 1
+
+        # A hit must belong to the queried card, i.e. not spill into the previous card's block
+        found = (codes >= 0) & (pos >= 0)
+        found[found] &= self._keys[pos[found]] > codes[found].astype(np.int64) * self._stride
+        if min_date is not None:
+            found[found] &= self.dates[pos[found]] >= np.datetime64(pd.Timestamp(min_date), "ns")
+
+        result[found] = self.values[pos[found]]
+        return result
+
+    def lookup_dict(self, card_ids: Iterable[Any], dates: Optional[Union[DateLike, Iterable[DateLike]]] = None,
+                    min_date: Optional[DateLike] = None) -> Dict[Any, float]:
+        """Same as `lookup`, as {tcgPlayerId: price} for the cards that have a price."""
+        card_ids = list(card_ids)
+        prices = self.lookup(card_ids, dates, min_date)
+        return {card_id: price for card_id, price in zip(card_ids, prices.tolist()) if not np.isnan(price)}
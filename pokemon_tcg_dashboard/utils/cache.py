@@ -0,0 +1,187 @@
+import functools
+import inspect
+import itertools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Named caches by creation serial, so their counters can be exposed in one
+# place. Several live caches may share a name (one per instance of a class).
+_CACHE_REGISTRY: "weakref.WeakValueDictionary[int, TTLCache]" = weakref.WeakValueDictionary()
+_CACHE_SERIALS = itertools.count(1)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Args:
+        maxsize (int): Maximum number of entries; the least recently used entry
+                       is evicted when full.
+        ttl (float, optional): Entry lifetime in seconds. None means entries
+                               never expire (only LRU eviction applies).
+        name (str, optional): Registers the cache so `get_cache_stats()` reports it.
+                              Names need not be unique.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 300.0, name: Optional[str] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self.serial = next(_CACHE_SERIALS)
+        if name is not None:
+            _CACHE_REGISTRY[self.serial] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    # -------------------- LOOKUPS --------------------
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        """Return the cached value for `key`, or `default` if absent or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            if count:
+                self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, computing it with `factory()` on a miss.
+
+        Concurrent callers asking for the same missing key wait for a single
+        computation instead of each running `factory` themselves.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key, _MISSING, count=False)
+            if value is _MISSING:
+                value = factory()
+                self.set(key, value)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    # -------------------- INVALIDATION --------------------
+    def invalidate(self, key: Hashable = _MISSING) -> None:
+        """Drop one entry, or every entry when called without a key."""
+        with self._lock:
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Counters for every live named cache, keyed by cache name.
+
+    When several live caches share a name (e.g. the caches of two
+    CardDataFetcher instances), each is reported as `name#serial`, its
+    creation number, so none hides another.
+    """
+    caches = sorted(_CACHE_REGISTRY.items())
+    counts: Dict[str, int] = {}
+    for _, cache in caches:
+        counts[cache.name] = counts.get(cache.name, 0) + 1
+    return {
+        (cache.name if counts[cache.name] == 1 else f"{cache.name}#{serial}"): cache.stats()
+        for serial, cache in caches
+    }
+
+
+def memoized_method(maxsize: int = 64) -> Callable[[Callable], Callable]:
+    """
+    Cache a method's results on the instance it is called on.
+
+    Entries are keyed by the bound arguments (so `f(1)` and `f(days=1)` share
+    one entry) and by the instance's `data_version` attribute, so results
+    computed before a reload are never served afterwards. The cache is stored
+    in the instance's `__dict__` and is freed together with the instance,
+    unlike `functools.lru_cache`, which keeps every `self` alive.
+
+    Args:
+        maxsize (int): Maximum number of results kept per instance and method.
+    """
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+        attr = f"_memo_{method.__name__}"
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.__dict__.get(attr)
+            if cache is None:
+                cache = self.__dict__.setdefault(
+                    attr, TTLCache(maxsize=maxsize, ttl=None, name=f"{type(self).__name__}.{method.__name__}")
+                )
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (getattr(self, "data_version", None),) + tuple(bound.arguments.items())[1:]
+            try:
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            return cache.get_or_set(key, lambda: method(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
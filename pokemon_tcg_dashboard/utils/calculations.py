@@ -40,6 +40,7 @@ def calculate_roi(price_history_df, ebay_history_df, card_id, grading_cost=27.99
     logging.debug("calculate_roi called")
     graded_data = ebay_history_df[ebay_history_df['tcgPlayerId'] == card_id].copy()
     ungraded_data = price_history_df[price_history_df['tcgPlayerId'] == card_id].copy()
+    price_by_grade = pd.Series(dtype=float)
 
     if not graded_data.empty or not ungraded_data.empty:
 
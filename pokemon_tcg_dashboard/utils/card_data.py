@@ -4,6 +4,10 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple, TypedDict
 
+from utils.cache import TTLCache
+from utils.calculations import calculate_cat_vol_price, calculate_roi
+from utils.trends import TrendTable
+
 
 class PricePoint(TypedDict):
     date: str
@@ -25,6 +29,13 @@ class CardData(TypedDict):
     price_history: List[PricePoint]
     condition: str
 
+class CardBundle(TypedDict):
+    card: CardData
+    tcg_history: pd.DataFrame
+    ebay_history: pd.DataFrame
+    volume_price: Optional[Tuple[Tuple[List[str], List[int]], Tuple[List[str], List[float]]]]
+    roi: List[Dict[str, Any]]
+
 class AggregatedPrices(TypedDict):
     average_price: float
     median_price: float
@@ -34,28 +45,131 @@ class AggregatedPrices(TypedDict):
     sample_size: int
 
 
+def _group_offsets(df: pd.DataFrame, columns: List[str]) -> Dict[Any, Tuple[int, int]]:
+    """
+    Map each key of a frame sorted by `columns` to its (start, stop) row range.
+
+    Single-column keys are plain values, multi-column keys are tuples.
+    """
+    if df.empty:
+        return {}
+    codes = [pd.factorize(df[col])[0] for col in columns]
+    changed = np.zeros(len(df) - 1, dtype=bool)
+    for c in codes:
+        changed |= c[1:] != c[:-1]
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+    stops = np.append(starts[1:], len(df))
+    if len(columns) == 1:
+        keys = df[columns[0]].to_numpy()[starts].tolist()
+    else:
+        keys = zip(*(df[col].to_numpy()[starts].tolist() for col in columns))
+    return {key: (int(a), int(b)) for key, a, b in zip(keys, starts, stops)}
+
+
 # ==========================================================
 # CardDataFetcher CLASS (All Numerical Returns Formatted)
 # ==========================================================
 
 class CardDataFetcher:
-    """Handles fetching and structuring individual card data with formatted price outputs."""
+    """
+    Handles fetching and structuring individual card data with formatted price outputs.
+
+    Results of `get_card_by_id` are kept in a size-bounded LRU cache whose
+    entries expire after `cache_ttl` seconds (date cutoffs are relative to
+    `datetime.now()`, so old entries go stale). `reload()` swaps in new frames
+    and clears the cache.
+    """
 
     def __init__(
         self,
         card_metadata_df: pd.DataFrame,
         price_history_df: pd.DataFrame,
-        ebay_prices_df: pd.DataFrame
+        ebay_prices_df: pd.DataFrame,
+        cache_size: int = 512,
+        cache_ttl: Optional[float] = 300.0
     ) -> None:
 
-        self.card_metadata: pd.DataFrame = card_metadata_df.copy()
-        self.price_history: pd.DataFrame = price_history_df.copy()
-        self.ebay_prices: pd.DataFrame = ebay_prices_df.copy()
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl, name="card_data")
+        self._bundle_cache = TTLCache(maxsize=max(1, cache_size // 4), ttl=cache_ttl, name="card_bundle")
+        self.reload(card_metadata_df, price_history_df, ebay_prices_df)
 
-        self.price_history["date"] = pd.to_datetime(self.price_history["date"], errors="coerce").dt.tz_localize(None)
-        self.ebay_prices["date"] = pd.to_datetime(self.ebay_prices["date"], errors="coerce").dt.tz_localize(None)
+    def reload(
+        self,
+        card_metadata_df: Optional[pd.DataFrame] = None,
+        price_history_df: Optional[pd.DataFrame] = None,
+        ebay_prices_df: Optional[pd.DataFrame] = None
+    ) -> None:
+        """
+        Replace any of the underlying frames, rebuild the indexes and drop cached results.
 
-        self._cache: Dict[Tuple[Any, ...], CardData] = {}
+        The metadata and price history are only read (the indexes sort them into
+        new frames), so they are copied only when the dates still need converting.
+        """
+        if card_metadata_df is not None:
+            self.card_metadata: pd.DataFrame = card_metadata_df
+        if price_history_df is not None:
+            self.price_history: pd.DataFrame = price_history_df
+            if not pd.api.types.is_datetime64_dtype(price_history_df["date"]):
+                self.price_history = price_history_df.copy()
+                self.price_history["date"] = pd.to_datetime(self.price_history["date"], errors="coerce").dt.tz_localize(None)
+            self.trends = TrendTable(self.price_history)
+        if ebay_prices_df is not None:
+            self.ebay_prices: pd.DataFrame = ebay_prices_df.copy()
+            self.ebay_prices["date"] = pd.to_datetime(self.ebay_prices["date"], errors="coerce").dt.tz_localize(None)
+
+        self._build_indexes()
+        self.invalidate_cache()
+
+    def invalidate_cache(self) -> None:
+        self._cache.invalidate()
+        self._bundle_cache.invalidate()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the card result cache."""
+        return self._cache.stats()
+
+    # -------------------- INDEXES --------------------
+    def _build_indexes(self) -> None:
+        """
+        Sort the frames once so every card (and card + condition / grade) is a
+        contiguous, date-ordered block, and remember where each block starts.
+        Per-card lookups then slice their own rows instead of scanning the
+        whole history.
+        """
+        self.ebay_prices["grade_norm"] = self.ebay_prices["grade"].str.replace(" ", "").str.lower()
+
+        self.price_history = self.price_history.sort_values(
+            ["tcgPlayerId", "condition", "date"], kind="mergesort"
+        )
+        self.ebay_prices = self.ebay_prices.sort_values(
+            ["tcgPlayerId", "grade_norm", "date"], kind="mergesort"
+        )
+
+        self._price_offsets = _group_offsets(self.price_history, ["tcgPlayerId"])
+        self._price_condition_offsets = _group_offsets(self.price_history, ["tcgPlayerId", "condition"])
+        self._ebay_offsets = _group_offsets(self.ebay_prices, ["tcgPlayerId"])
+        self._ebay_grade_offsets = _group_offsets(self.ebay_prices, ["tcgPlayerId", "grade_norm"])
+
+        metadata_ids = self.card_metadata["tcgPlayerId"].to_numpy()
+        _, first_rows = np.unique(metadata_ids, return_index=True)
+        self._metadata_rows = dict(zip(metadata_ids[first_rows].tolist(), first_rows.tolist()))
+
+    def _card_prices(self, card_id: int, condition: str = "any") -> pd.DataFrame:
+        """TCGplayer price rows for one card, optionally for one condition."""
+        if condition == "any":
+            start, stop = self._price_offsets.get(card_id, (0, 0))
+        else:
+            start, stop = self._price_condition_offsets.get((card_id, condition), (0, 0))
+        return self.price_history.iloc[start:stop]
+
+    def _card_ebay_prices(self, card_id: int, grade: Optional[str] = None) -> pd.DataFrame:
+        """eBay graded rows for one card, optionally for one grade (e.g. "PSA 10")."""
+        if grade is None:
+            start, stop = self._ebay_offsets.get(card_id, (0, 0))
+        else:
+            grade_norm = grade.replace(" ", "").lower()
+            start, stop = self._ebay_grade_offsets.get((card_id, grade_norm), (0, 0))
+        return self.ebay_prices.iloc[start:stop]
 
     # -------------------- HELPER --------------------
     def format_value(self, value: float, sign: str = "") -> str:
@@ -78,14 +192,16 @@ class CardDataFetcher:
     ) -> Optional[CardData]:
 
         cache_key = (card_id, days, condition)
-        if use_cache and cache_key in self._cache:
-            return self._cache[cache_key]
+        if use_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        card_info_df = self.card_metadata[self.card_metadata["tcgPlayerId"] == card_id]
-        if card_info_df.empty:
+        row = self._metadata_rows.get(card_id)
+        if row is None:
             return None
 
-        card_info = card_info_df.iloc[0]
+        card_info = self.card_metadata.iloc[row]
 
         current_price = self.get_current_market_price(card_id, days=days, condition=condition)
         psa10_price = self.get_psa_price(card_id, grade = "psa10", days=days)
@@ -114,9 +230,36 @@ class CardDataFetcher:
             "card_trend": card_trend
         }
 
-        self._cache[cache_key] = card_data
+        self._cache.set(cache_key, card_data)
         return card_data
 
+    def get_card_bundle(self, card_id: int) -> Optional[CardBundle]:
+        """
+        Everything the card page needs for one card, computed once and shared.
+
+        The card view fires several callbacks for the same URL; they all read
+        from this bundle (cached per card id) instead of each re-filtering the
+        full price frames.
+        """
+        return self._bundle_cache.get_or_set(card_id, lambda: self._build_card_bundle(card_id))
+
+    def _build_card_bundle(self, card_id: int) -> Optional[CardBundle]:
+        card = self.get_card_by_id(card_id=card_id, days=None, condition="any")
+        if card is None:
+            return None
+
+        # sort_index restores file order so chart traces come out as before
+        tcg_history = self._card_prices(card_id).sort_index()
+        ebay_history = self._card_ebay_prices(card_id).sort_index()
+
+        return {
+            "card": card,
+            "tcg_history": tcg_history,
+            "ebay_history": ebay_history,
+            "volume_price": calculate_cat_vol_price(tcg_history, ebay_history, card_id),
+            "roi": calculate_roi(tcg_history, ebay_history, card_id),
+        }
+
     # ==========================================================
     # Price Functions (Formatted)
     # ==========================================================
@@ -127,9 +270,7 @@ class CardDataFetcher:
         condition: str = "any"
     ) -> str:
         cutoff = None if days is None else datetime.now() - timedelta(days=days)
-        df = self.price_history[self.price_history["tcgPlayerId"] == card_id]
-        if condition != "any":
-            df = df[df["condition"] == condition]
+        df = self._card_prices(card_id, condition)
         if cutoff:
             df = df[df["date"] >= cutoff]
         if df.empty:
@@ -143,9 +284,7 @@ class CardDataFetcher:
         grade: str,
         days: Optional[int] = None
     ) -> str:
-        grade_norm = grade.replace(" ", "").lower()
-        df = self.ebay_prices[self.ebay_prices["tcgPlayerId"] == card_id]
-        df = df[df["grade"].str.replace(" ", "").str.lower() == grade_norm]
+        df = self._card_ebay_prices(card_id, grade)
         if df.empty:
             return "None"
         if days is not None:
@@ -153,7 +292,7 @@ class CardDataFetcher:
             df_recent = df[df["date"] >= cutoff]
             if not df_recent.empty:
                 df = df_recent
-        latest = float(df.sort_values("date").iloc[-1]["average"])
+        latest = float(df.iloc[-1]["average"])
         return self.format_value(latest)
 
     def get_ungraded_price(
@@ -162,9 +301,7 @@ class CardDataFetcher:
         days: Optional[int] = 30,
         condition: str = "Near Mint"
     ) -> str:
-        df = self.price_history[self.price_history["tcgPlayerId"] == card_id]
-        if condition != "any":
-            df = df[df["condition"] == condition]
+        df = self._card_prices(card_id, condition)
         if df.empty:
             return self.format_value(0.0)
         cutoff = None if days is None else datetime.now() - timedelta(days=days)
@@ -184,9 +321,7 @@ class CardDataFetcher:
         condition: str = "any"
     ) -> int:
         cutoff = None if days is None else datetime.now() - timedelta(days=days)
-        df = self.price_history[self.price_history["tcgPlayerId"] == card_id]
-        if condition != "any":
-            df = df[df["condition"] == condition]
+        df = self._card_prices(card_id, condition)
         if cutoff:
             df = df[df["date"] >= cutoff]
         
@@ -200,9 +335,7 @@ class CardDataFetcher:
         condition: str = "any"
     ) -> List[PricePoint]:
         cutoff = None if days is None else datetime.now() - timedelta(days=days)
-        df = self.price_history[self.price_history["tcgPlayerId"] == card_id]
-        if condition != "any":
-            df = df[df["condition"] == condition]
+        df = self._card_prices(card_id, condition)
         if cutoff:
             df = df[df["date"] >= cutoff]
         if df.empty:
@@ -224,14 +357,10 @@ class CardDataFetcher:
         days: Optional[int] = None
     ) -> AggregatedPrices:
         if grade:
-            grade_norm = grade.replace(" ", "").lower()
-            df = self.ebay_prices[self.ebay_prices["tcgPlayerId"] == card_id]
-            df = df[df["grade"].str.replace(" ", "").str.lower() == grade_norm]
+            df = self._card_ebay_prices(card_id, grade)
             price_col = "average"
         else:
-            df = self.price_history[self.price_history["tcgPlayerId"] == card_id]
-            if condition != "any":
-                df = df[df["condition"] == condition]
+            df = self._card_prices(card_id, condition)
             price_col = "market"
         if df.empty:
             return {
@@ -290,36 +419,20 @@ class CardDataFetcher:
             "psa_9": self.aggregate_prices(card_id, grade="psa9", days=days),
             "psa_10": self.aggregate_prices(card_id, grade="psa10", days=days)
         }
-    def card_trend(self, card_id, threshold=0.02):
+    def card_trend(self, card_id, threshold=0.02, window=None):
         """
         Determine whether a card is trending up, down, or stable based on price history.
-        
-        prices    : list of prices ordered oldest → newest
-        threshold : minimum % change to consider it a real trend (default 2%)
-        
-        Returns:
-            "up", "down", or "stable"
-        """
-        prices = (self.price_history[self.price_history["tcgPlayerId"] == card_id].sort_values("date", ascending=False))["market"]
-        if len(prices) < 2:
-            return "not enough data"
-
-        # Convert to numpy for easier math
-        prices = np.array(prices)
 
-        # Fit a simple linear regression line: y = m*x + b
-        x = np.arange(len(prices))
-        m, b = np.polyfit(x, prices, 1)
+        Looked up in the precomputed trend table: the least-squares slope of the
+        card's prices (oldest → newest) and their % change over `window` days
+        (None: the whole history).
 
-        # Percent change from beginning to end
-        pct_change = (prices[-1] - prices[0]) / prices[0]
+        threshold : minimum % change to consider it a real trend (default 2%)
 
-        if m > 0 and pct_change > threshold:
-            return "up"
-        elif m < 0 and pct_change < -threshold:
-            return "down"
-        else:
-            return "stable"
+        Returns:
+            "up", "down", "stable" or "not enough data"
+        """
+        return self.trends.trend(card_id, window=window, threshold=threshold)
 
 # ==========================================================
 # __main__
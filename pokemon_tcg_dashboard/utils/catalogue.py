@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+from utils.cache import TTLCache
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Metadata columns a catalogue search matches against
+SEARCH_COLUMNS = ["name", "setName", "rarity", "artist", "cardNumber", "cardType", "tcgPlayerId"]
+
+# Columns the catalogue image grid renders
+GRID_COLUMNS = ["tcgPlayerId", "name", "imageUrl"]
+
+# Joins the fields of one card; never typed into a search box, so a query
+# cannot match across two fields.
+_FIELD_SEPARATOR = "\x1f"
+
+
+class CatalogueIndex:
+    """
+    Prebuilt search index over the card metadata for the catalogue page.
+
+    Each card's searchable fields are lower-cased and joined into a single
+    string once, so a search is one vectorized substring scan instead of a
+    row-wise `apply` over every metadata column. Filtering and pagination
+    also happen here, so the browser only receives the cards of one page.
+
+    Args:
+        card_metadata_df (pd.DataFrame): Card metadata with a `tcgPlayerId` column.
+        cache_size (int): Number of recent search results kept.
+    """
+
+    def __init__(self, card_metadata_df: pd.DataFrame, cache_size: int = 256) -> None:
+        self._results = TTLCache(maxsize=cache_size, ttl=None, name="catalogue_search")
+        self.reload(card_metadata_df)
+
+    def reload(self, card_metadata_df: pd.DataFrame) -> None:
+        """Rebuild the index for new metadata and drop cached results."""
+        self.card_ids = card_metadata_df["tcgPlayerId"].to_numpy()
+        self._set_names = card_metadata_df["setName"].reset_index(drop=True)
+        self._rarities = card_metadata_df["rarity"].reset_index(drop=True)
+        self._grid = card_metadata_df[GRID_COLUMNS].reset_index(drop=True)
+
+        columns = [c for c in SEARCH_COLUMNS if c in card_metadata_df.columns]
+        fields = card_metadata_df[columns]
+        fields = fields.astype(str).where(fields.notna(), "")
+        text = fields.iloc[:, 0].str.cat(
+            [fields[c] for c in columns[1:]], sep=_FIELD_SEPARATOR
+        )
+        self._search_text = text.str.lower().reset_index(drop=True)
+
+        self._results.invalidate()
+
+    def search_mask(self, query: Optional[str]) -> np.ndarray:
+        """Boolean mask over the metadata rows whose searchable text contains `query`."""
+        query = (query or "").strip().lower()
+        if not query:
+            return np.ones(len(self.card_ids), dtype=bool)
+
+        return self._results.get_or_set(
+            query,
+            lambda: self._search_text.str.contains(query, regex=False).to_numpy(),
+        )
+
+    def search(self, query: Optional[str]) -> np.ndarray:
+        """tcgPlayerIds of the cards matching `query` (case-insensitive substring)."""
+        return self.card_ids[self.search_mask(query)]
+
+    def filter_mask(self, sets: Optional[List[str]] = None, rarities: Optional[List[str]] = None, query: Optional[str] = None) -> np.ndarray:
+        """Boolean mask of the cards matching the catalogue's set, rarity and search filters."""
+        mask = self.search_mask(query)
+        if sets:
+            mask = mask & self._set_names.isin(sets).to_numpy()
+        if rarities:
+            mask = mask & self._rarities.isin(rarities).to_numpy()
+        return mask
+
+    def page(self, page: int, per_page: int, sets: Optional[List[str]] = None, rarities: Optional[List[str]] = None, query: Optional[str] = None) -> Tuple[pd.DataFrame, int]:
+        """
+        One page of the filtered catalogue.
+
+        Args:
+            page (int): Zero-based page number.
+            per_page (int): Cards per page.
+            sets, rarities, query: Filters, as in `filter_mask`.
+
+        Returns:
+            Tuple[pd.DataFrame, int]: The page's rows (GRID_COLUMNS only) and
+                                      the total number of matching cards.
+        """
+        positions = np.flatnonzero(self.filter_mask(sets, rarities, query))
+        start = page * per_page
+        return self._grid.iloc[positions[start:start + per_page]], len(positions)
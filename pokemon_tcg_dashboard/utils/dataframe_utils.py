@@ -1,16 +1,32 @@
 import pandas as pd
-from utils.loader import get_image_urls
+import global_variables
+from utils.loader import load_data
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Metadata columns the image grid / card summary helpers need.
+METADATA_SUMMARY_COLUMNS = ["tcgPlayerId", "setName", "name", "rarity", "imageUrl"]
+
+def get_image_urls(filename: str="cards_metadata_table.csv", ids: list = []) -> pd.DataFrame:
+    """`METADATA_SUMMARY_COLUMNS` of the cards in `ids` (all cards when empty)."""
+    if filename != "cards_metadata_table.csv":
+        filters = {'tcgPlayerId': list(ids)} if ids else None
+        return load_data(filename, compact=True, columns=METADATA_SUMMARY_COLUMNS, filters=filters)
+    return global_variables.METADATA_REPOSITORY.frame_for(ids or None, METADATA_SUMMARY_COLUMNS)
+
+def get_card_metadata(card_id, columns=METADATA_SUMMARY_COLUMNS) -> pd.Series:
+    """Metadata row of one card; `columns=None` for every column."""
+    logger.debug("Fetching metadata for card_id: %s", card_id)
+    card_row = global_variables.METADATA_REPOSITORY.frame_for([card_id], columns)
+    return card_row.squeeze()
+
 def filter_dataframe_by_ids(
         df: pd.DataFrame, 
         id_list: list, 
         id_column: str = 'tcgPlayerId') -> pd.DataFrame:
-    
+    """Rows of `df` whose `id_column` is in `id_list`; with no `df`, the cards' metadata summary."""
     logger.info("Filtering DataFrame for Portfolio")
-    df = get_image_urls()
-    mask = df[id_column].isin(id_list)
-    filtered_df = df[mask]
-    return filtered_df
\ No newline at end of file
+    if df is None:
+        return get_image_urls(ids=list(id_list))
+    return df[df[id_column].isin(id_list)]
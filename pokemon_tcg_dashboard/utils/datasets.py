@@ -0,0 +1,135 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from utils.cache import TTLCache
+from utils.loader import project
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _freeze(filters: Optional[Dict[str, Any]]) -> Hashable:
+    """Hashable form of a `filters` dict, for projection cache keys."""
+    if not filters:
+        return None
+    frozen = []
+    for column, wanted in sorted(filters.items()):
+        if isinstance(wanted, (str, bytes)) or not isinstance(wanted, Iterable):
+            wanted = [wanted]
+        frozen.append((column, tuple(sorted(wanted, key=repr))))
+    return tuple(frozen)
+
+
+class DatasetRegistry:
+    """
+    Named datasets that are loaded on first access.
+
+    Each dataset is registered with a zero-argument loader. `get(name)` runs
+    the loader once and keeps the result; concurrent first accesses wait for
+    that single load (see `TTLCache.get_or_set`). Loaders may `get` other
+    datasets, e.g. a calculator built from the price history.
+
+    Frame datasets can also be read narrowly with `get(name, columns=...,
+    filters=...)`. A loaded dataset is sliced in memory; otherwise a loader
+    registered with `projectable=True` is called with the projection, so it
+    can push it down into `load_data` instead of materializing every column.
+
+    Args:
+        name (str): Name of the underlying cache in `get_cache_stats()`.
+    """
+
+    def __init__(self, name: str = "datasets") -> None:
+        self._loaders: Dict[str, Callable[..., Any]] = {}
+        self._projectable: Set[str] = set()
+        self._values = TTLCache(maxsize=1024, ttl=None, name=name)
+        self._projections = TTLCache(maxsize=256, ttl=None, name=f"{name}_projections")
+
+    def register(self, name: str, projectable: bool = False) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Decorator registering `loader` as the dataset `name`.
+
+        A projectable loader takes `columns=None, filters=None` keyword
+        arguments (see `utils.loader.project`).
+        """
+        def decorator(loader: Callable[..., Any]) -> Callable[..., Any]:
+            self._loaders[name] = loader
+            if projectable:
+                self._projectable.add(name)
+            return loader
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._loaders
+
+    def names(self) -> List[str]:
+        return list(self._loaders)
+
+    # -------------------- ACCESS --------------------
+    def get(self, name: str, columns: Optional[Iterable[str]] = None,
+            filters: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        The dataset `name`, loading it first if needed.
+
+        With `columns` / `filters` only those columns of the matching rows
+        are returned; each distinct projection is kept like a dataset.
+        """
+        if name not in self._loaders:
+            raise KeyError(f"Unknown dataset: {name}")
+        if columns is None and not filters:
+            return self._values.get_or_set(name, lambda: self._load(name))
+
+        columns = None if columns is None else tuple(columns)
+        key = (name, columns, _freeze(filters))
+        return self._projections.get_or_set(key, lambda: self._load_projection(name, columns, filters))
+
+    def _load(self, name: str) -> Any:
+        started = time.perf_counter()
+        value = self._loaders[name]()
+        logger.info("Loaded dataset %s in %.2fs", name, time.perf_counter() - started)
+        return value
+
+    def _load_projection(self, name: str, columns: Optional[Tuple[str, ...]], filters: Optional[Dict[str, Any]]) -> Any:
+        if self.is_loaded(name) or name not in self._projectable:
+            return project(self.get(name), columns, filters)
+        started = time.perf_counter()
+        value = self._loaders[name](columns=None if columns is None else list(columns), filters=filters)
+        logger.info("Loaded projection of dataset %s in %.2fs", name, time.perf_counter() - started)
+        return value
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._values
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget one dataset (or all of them) and every projection; the next access reloads it."""
+        if name is None:
+            self._values.invalidate()
+        else:
+            self._values.invalidate(name)
+        self._projections.invalidate()
+
+    # -------------------- WARM-UP --------------------
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load datasets ahead of their first use.
+
+        Args:
+            names: Datasets to load, in order; defaults to all of them.
+            background (bool): Load in a daemon thread and return it, so the
+                               caller (e.g. the web server) is not blocked.
+        """
+        names = self.names() if names is None else list(names)
+
+        def run() -> None:
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    logger.error("Warm-up of dataset %s failed: %s", name, e)
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="dataset-warm-up", daemon=True)
+        thread.start()
+        return thread
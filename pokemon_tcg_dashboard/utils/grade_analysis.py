@@ -30,8 +30,8 @@ def create_grade_distribution_chart(data: pd.DataFrame, card_id=None, card_name=
     if card_id is not None and 'tcgPlayerId' in data.columns:
         data = data[data['tcgPlayerId'] == card_id]
 
-    # Standardize grade names
-    data['grade'] = data['grade'].str.upper().str.replace('PSA', 'PSA ')
+    # Standardize grade names (without touching the caller's frame)
+    data = data.assign(grade=data['grade'].str.upper().str.replace('PSA', 'PSA '))
 
     # Aggregate counts per grade
     grade_counts = data.groupby('grade')['count'].sum().reindex(grade_order, fill_value=0)
@@ -1,41 +1,377 @@
 import glob
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
 import pandas as pd
 import logging
 
 from pathlib import Path
+from typing import Optional
+
+from utils.cache import TTLCache
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent     # project root
 DATA_DIR = BASE_DIR / "data"
+CACHE_DIR = DATA_DIR / ".cache"                       # parsed CSVs, one file per column
+
+# Bump when the on-disk cache layout or the parsing rules change.
+CACHE_VERSION = 1
 
 # Initialize module logger; application can configure handlers/levels.
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-def load_data(filename: str, parse_dates=[]) -> pd.DataFrame:
-    """Load data from a CSV file into a pandas DataFrame."""
+# Dtype schemas for `load_data(..., compact=True)`, per data file:
+#   "category": low-cardinality text columns, stored as pandas categoricals
+#   "drop_suffixes": derived text columns to drop, e.g. the "$1.23"
+#                    `priceString` copy next to every numeric price
+# Numeric columns of every file are downcast where that is lossless.
+SCHEMAS = {
+    "cards_metadata_table.csv": {
+        "category": ["setId", "setName", "rarity", "cardType", "stage",
+                     "weakness.type", "resistance.type", "prices.primaryCondition"],
+        "drop_suffixes": [".priceString"],
+    },
+    "price_history.csv": {
+        "category": ["id", "condition"],
+    },
+    "ebay_price_history.csv": {
+        "category": ["id", "grade"],
+    },
+}
+
+# Before/after memory of every frame compacted by this process, by file name.
+_MEMORY_REPORTS = {}
+
+# Cached columns read by projected loads (`load_data(..., columns=...)`),
+# keyed by cache entry, content hash and column, so narrow consumers share them.
+_COLUMN_CACHE = TTLCache(maxsize=256, ttl=None, name="loader_columns")
+
+# Wide per-variant price columns of the card metadata:
+# "prices.variants.<variant>.<condition>.<field>", e.g. "prices.variants.Holofoil.Near Mint.price"
+VARIANT_PRICE_PREFIX = "prices.variants."
+
+# -------------------------------------------------------------
+# Columnar cache
+# -------------------------------------------------------------
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_entry(filename: str, parse_dates, schema=None) -> Path:
+    """Cache directory for one source file + parsing options."""
+    options = {"parse_dates": sorted(parse_dates)}
+    if schema is not None:
+        options["schema"] = schema
+    options = json.dumps(options, sort_keys=True)
+    options_key = hashlib.sha1(options.encode()).hexdigest()[:10]
+    stem = str(Path(filename).with_suffix("")).replace(os.sep, "_").replace("/", "_")
+    return CACHE_DIR / f"{stem}-{options_key}"
+
+def _read_manifest(entry: Path) -> dict:
+    try:
+        with open(entry / "manifest.json") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == CACHE_VERSION else {}
+
+def _is_fresh(entry: Path, manifest: dict, source: Path) -> bool:
+    """
+    Check a cache entry against its source CSV.
+
+    mtime + size is the fast path; when only the mtime moved (checkout, copy)
+    the content hash decides, and the manifest is refreshed on a match.
+    """
+    if not manifest:
+        return False
+    stat = source.stat()
+    if manifest["size"] != stat.st_size:
+        return False
+    if manifest["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if manifest["sha1"] != _file_hash(source):
+        return False
+    manifest["mtime_ns"] = stat.st_mtime_ns
+    try:
+        with open(entry / "manifest.json", "w") as f:
+            json.dump(manifest, f)
+    except OSError:
+        pass
+    return True
+
+def _read_cache(entry: Path, manifest: dict, columns=None, filters=None) -> pd.DataFrame:
+    if columns is None and not filters:
+        index = pd.read_pickle(entry / "index.pkl")
+        data = {
+            name: pd.read_pickle(entry / f"{i}.pkl")
+            for i, name in enumerate(manifest["columns"])
+        }
+        return pd.DataFrame(data, index=index, copy=False)
+
+    # Projection: only the requested (and filtered-on) column files are read,
+    # and they are kept for the next narrow load of the same file.
+    positions = {name: i for i, name in enumerate(manifest["columns"])}
+    wanted = manifest["columns"] if columns is None else list(columns)
+    missing = [c for c in list(wanted) + list(filters or {}) if c not in positions]
+    if missing:
+        raise KeyError(f"{manifest['source']} has no columns {missing}")
+
+    def read(name):
+        path = entry / ("index.pkl" if name is None else f"{positions[name]}.pkl")
+        return _COLUMN_CACHE.get_or_set((entry.name, manifest["sha1"], name), lambda: pd.read_pickle(path))
+
+    mask = _filter_mask({col: read(col) for col in (filters or {})}, filters)
+    index = read(None)
+    data = {name: read(name) for name in wanted}
+    if mask is not None:
+        index = index[mask]
+        data = {name: values[mask] for name, values in data.items()}
+    # Copied, so callers can never modify the shared cached columns
+    return pd.DataFrame(data, index=index, copy=True)
+
+def _write_cache(entry: Path, df: pd.DataFrame, source: Path, memory_report=None) -> None:
+    stat = source.stat()
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": source.name,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": _file_hash(source),
+        "columns": [str(c) for c in df.columns],
+    }
+    if memory_report is not None:
+        manifest["memory_report"] = memory_report
+    tmp = entry.with_name(f"{entry.name}.tmp-{os.getpid()}")
+    try:
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        pd.to_pickle(df.index, tmp / "index.pkl")
+        for i, name in enumerate(df.columns):
+            pd.to_pickle(df[name].array, tmp / f"{i}.pkl")
+        with open(tmp / "manifest.json", "w") as f:
+            json.dump(manifest, f)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+    except OSError as e:
+        # Another worker may have won the race, or the data dir is read-only.
+        logger.warning("Could not write data cache %s: %s", entry, e)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _parse_csv(path: Path, parse_dates, columns=None) -> pd.DataFrame:
+    usecols = None
+    if columns is not None:
+        # The index column (first in the file) is always read
+        index_column = pd.read_csv(path, nrows=0).columns[0]
+        usecols = [index_column] + [c for c in columns if c != index_column]
+    df = pd.read_csv(path, index_col=0, usecols=usecols)
+    # Normalise every date column to tz-naive so callers never have to.
+    for col in parse_dates:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True).dt.tz_localize(None)
+    return df
+
+# -------------------------------------------------------------
+# Projection
+# -------------------------------------------------------------
+def _filter_mask(values: dict, filters) -> Optional[np.ndarray]:
+    """Rows whose value is (one of) `filters[column]` for every filtered column."""
+    mask = None
+    for column, wanted in (filters or {}).items():
+        if isinstance(wanted, (str, bytes)) or not pd.api.types.is_list_like(wanted):
+            wanted = [wanted]
+        matches = pd.Series(values[column]).isin(list(wanted)).to_numpy()
+        mask = matches if mask is None else mask & matches
+    return mask
+
+def project(df: pd.DataFrame, columns=None, filters=None) -> pd.DataFrame:
+    """
+    Columns `columns` (default all) of the rows matching `filters`.
+
+    `filters` maps a column to a value or a list of values, e.g.
+    {"setName": ["SV: Black Bolt"], "rarity": "Rare"}; rows must match every
+    entry.
+    """
+    mask = _filter_mask({col: df[col] for col in (filters or {})}, filters)
+    if mask is None and columns is None:
+        return df
+    if mask is not None:
+        df = df[mask]
+    # A copy, so the projection never aliases the full frame
+    return (df if columns is None else df[list(columns)]).copy()
+
+# -------------------------------------------------------------
+# Compact dtypes
+# -------------------------------------------------------------
+def _downcast(col: pd.Series) -> pd.Series:
+    """int32 / float32 version of a numeric column, if no value changes."""
+    if pd.api.types.is_bool_dtype(col) or not pd.api.types.is_numeric_dtype(col):
+        return col
+    if pd.api.types.is_integer_dtype(col):
+        # Not below int32, so sums of small counts cannot overflow
+        info = np.iinfo(np.int32)
+        if col.dtype.itemsize > 4 and (col.empty or (col.min() >= info.min and col.max() <= info.max)):
+            return col.astype(np.int32)
+        return col
+    small = col.astype(np.float32)
+    if np.array_equal(small.to_numpy(dtype=np.float64), col.to_numpy(), equal_nan=True):
+        return small
+    return col
+
+def compact_dtypes(df: pd.DataFrame, schema: dict) -> tuple:
+    """
+    Shrink a frame according to a `SCHEMAS` entry.
+
+    Drops the derived text columns, turns the listed text columns into
+    categoricals and downcasts numeric columns where that is lossless
+    (integers to int32, floats to float32 when every value survives the
+    round trip, so prices keep their float64).
+
+    Returns:
+        tuple: (compacted frame, memory report dict with before/after bytes,
+               the dropped columns and the converted columns).
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    suffixes = tuple(schema.get("drop_suffixes", []))
+    dropped = [c for c in df.columns if suffixes and str(c).endswith(suffixes)]
+    df = df.drop(columns=dropped)
+
+    columns, converted = {}, {}
+    categories = set(schema.get("category", []))
+    for name in df.columns:
+        col = df[name]
+        if name in categories and col.dtype == object:
+            new = col.astype("category")
+        else:
+            new = _downcast(col)
+        if new.dtype != col.dtype:
+            converted[str(name)] = f"{col.dtype} -> {new.dtype}"
+        columns[name] = new
+    df = pd.DataFrame(columns, index=df.index, copy=False)
+
+    after = int(df.memory_usage(deep=True).sum())
+    report = {
+        "before_bytes": before,
+        "after_bytes": after,
+        "dropped": dropped,
+        "converted": converted,
+    }
+    return df, report
+
+def _log_memory_report(filename: str, report: dict) -> None:
+    _MEMORY_REPORTS[filename] = report
+    before, after = report["before_bytes"], report["after_bytes"]
+    logger.info(
+        "Compacted %s: %.1f MB -> %.1f MB (%.0f%% smaller, %d columns dropped, %d converted)",
+        filename, before / 1e6, after / 1e6, 100 * (1 - after / before) if before else 0,
+        len(report["dropped"]), len(report["converted"]),
+    )
+
+def get_memory_reports() -> dict:
+    """Before/after memory of the frames loaded with `compact=True`, by file name."""
+    return dict(_MEMORY_REPORTS)
+
+def load_data(filename: str, parse_dates=[], use_cache: bool = True, compact: bool = False,
+              columns=None, filters=None) -> pd.DataFrame:
+    """
+    Load data from a CSV file into a pandas DataFrame.
+
+    The parsed frame (with `parse_dates` columns converted to tz-naive
+    datetimes) is cached column-by-column under `data/.cache` and reused until
+    the CSV's mtime and content hash change, so only the first start after an
+    update pays for `read_csv`.
+
+    With `compact=True` the frame is shrunk with the file's `SCHEMAS` entry
+    (see `compact_dtypes`) before it is cached; the before/after memory is
+    logged and kept in `get_memory_reports()`.
+
+    `columns` and `filters` (see `project`) narrow the result: from the cache
+    only those column files are read (and kept in memory for the next narrow
+    load), and without the cache only those columns are parsed.
+    """
     logger.debug("Loading data file: %s", filename)
-    if len(parse_dates) >0:
-        return pd.read_csv(DATA_DIR / filename, index_col=0, parse_dates=parse_dates)
-    return pd.read_csv(DATA_DIR / filename, index_col=0)
-
-def get_image_urls(filename: str="cards_metadata_table.csv", ids: list = []) -> pd.DataFrame:
-    metadata_df = load_data(filename)
-    #metadata_df = metadata_df[['tcgPlayerId','setName','name', 'rarity','imageUrl']]
-    if ids:
-        mask = metadata_df['tcgPlayerId'].isin(ids)
-        logger.debug("Filtered metadata dataframe type: %s", type(metadata_df[mask]))
-        return metadata_df[mask]
-    else:
-        return metadata_df
-    
-def get_card_metadata(card_id) -> pd.Series:
-    logger.debug("Fetching metadata for card_id: %s", card_id)
-    metadata_df = load_data("cards_metadata_table.csv")
-    card_row = metadata_df[metadata_df['tcgPlayerId'] == int(card_id)]
-    #print(card_row)
-    #print(metadata_df.dtypes)
-    return card_row.squeeze()
+    source = DATA_DIR / filename
+    schema = SCHEMAS.get(filename, {}) if compact else None
+    if not use_cache:
+        parsed = None if columns is None else list(columns) + [c for c in (filters or {}) if c not in columns]
+        df = _parse_csv(source, parse_dates, parsed)
+        if schema is not None:
+            df, report = compact_dtypes(df, schema)
+            _log_memory_report(filename, report)
+        return project(df, columns, filters)
+
+    entry = _cache_entry(filename, parse_dates, schema)
+    manifest = _read_manifest(entry)
+    if _is_fresh(entry, manifest, source):
+        try:
+            df = _read_cache(entry, manifest, columns, filters)
+            if "memory_report" in manifest:
+                _MEMORY_REPORTS[filename] = manifest["memory_report"]
+            return df
+        except KeyError:
+            raise
+        except Exception as e:
+            logger.warning("Discarding unreadable data cache %s: %s", entry, e)
+
+    logger.info("Parsing %s (data cache miss)", filename)
+    df = _parse_csv(source, parse_dates)
+    report = None
+    if schema is not None:
+        df, report = compact_dtypes(df, schema)
+        _log_memory_report(filename, report)
+    _write_cache(entry, df, source, report)
+    return project(df, columns, filters)
+
+# -------------------------------------------------------------
+# Variant prices
+# -------------------------------------------------------------
+def split_variant_prices(df: pd.DataFrame) -> tuple:
+    """
+    Move the wide `prices.variants.*` metadata columns into a long table.
+
+    The wide block has one price / listings / priceString column per
+    (variant, condition) and is mostly NaN; the long table only keeps the
+    (card, variant, condition) combinations that have a price or listings.
+
+    Returns:
+        tuple: (metadata without the variant columns,
+               long frame with columns tcgPlayerId, variant, condition, price, listings)
+    """
+    wide = [c for c in df.columns if str(c).startswith(VARIANT_PRICE_PREFIX)]
+    if not wide:
+        return df, pd.DataFrame(columns=["tcgPlayerId", "variant", "condition", "price", "listings"])
+    pairs = {}
+    for name in wide:
+        pair, field = name[len(VARIANT_PRICE_PREFIX):].rsplit(".", 1)
+        variant, condition = pair.split(".", 1)
+        pairs.setdefault((variant, condition), {})[field] = name
+
+    card_ids = df["tcgPlayerId"].to_numpy()
+    no_values = np.full(len(df), np.nan)
+    parts = []
+    for (variant, condition), fields in pairs.items():
+        price = df[fields["price"]].to_numpy(dtype=float) if "price" in fields else no_values
+        listings = df[fields["listings"]].to_numpy(dtype=float) if "listings" in fields else no_values
+        keep = ~(np.isnan(price) & np.isnan(listings))
+        parts.append(pd.DataFrame({
+            "tcgPlayerId": card_ids[keep],
+            "variant": variant,
+            "condition": condition,
+            "price": price[keep],
+            "listings": listings[keep].astype(np.float32),
+        }))
+
+    columns = ["tcgPlayerId", "variant", "condition", "price", "listings"]
+    long = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+    long["variant"] = pd.Categorical(long["variant"], categories=sorted({v for v, _ in pairs}))
+    long["condition"] = pd.Categorical(long["condition"], categories=sorted({c for _, c in pairs}))
+    return df.drop(columns=wide), long[columns]
 
 def get_set_price_history() -> pd.DataFrame:
     set_price_history_dir = DATA_DIR / "set_price_history"
@@ -1,8 +1,152 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from functools import lru_cache
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+
+from utils.cache import memoized_method
+
+
+def _is_all_time(days: Optional[int]) -> bool:
+    """Both None and -1 are used by callers to mean 'all time'."""
+    return days is None or days == -1
+
+
+class _CardBlocks:
+    """
+    Non-null values of one price history column, grouped into one contiguous,
+    date-ordered block per card.
+
+    Card `k` owns rows `starts[k]:ends[k]`, so its latest value is the last row
+    of its block and "the value as of date D" is found by counting how many of
+    its rows fall on or before D.
+    """
+
+    def __init__(self, codes: np.ndarray, dates: np.ndarray, values: np.ndarray, n_cards: int) -> None:
+        valid = ~np.isnan(values)
+        self.dates = dates[valid]
+        self.values = values[valid]
+
+        card_index = np.arange(n_cards)
+        self.starts = np.searchsorted(codes[valid], card_index, side='left')
+        self.ends = np.searchsorted(codes[valid], card_index, side='right')
+
+    def _rows_per_card(self, mask: np.ndarray) -> np.ndarray:
+        """Number of rows in each card's block for which `mask` is True."""
+        running = np.concatenate(([0], np.cumsum(mask)))
+        return running[self.ends] - running[self.starts]
+
+    def latest(self, since: Optional[np.datetime64] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Latest value per card, optionally only if it is dated on/after `since`."""
+        has_rows = self.ends > self.starts
+        pos = np.where(has_rows, self.ends - 1, 0)
+        if since is not None and len(self.dates):
+            has_rows &= self.dates[pos] >= since
+        return self.values[pos] if len(self.values) else np.zeros(len(pos)), has_rows
+
+    def earliest(self, since: Optional[np.datetime64] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Earliest value per card, optionally the first one dated on/after `since`."""
+        pos = self.starts.copy()
+        if since is not None:
+            pos += self._rows_per_card(self.dates < since)
+        has_rows = pos < self.ends
+        pos = np.where(has_rows, pos, 0)
+        return self.values[pos] if len(self.values) else np.zeros(len(pos)), has_rows
+
+    def as_of(self, date: np.datetime64) -> Tuple[np.ndarray, np.ndarray]:
+        """Last value per card dated on/before `date`."""
+        count = self._rows_per_card(self.dates <= date)
+        has_rows = count > 0
+        pos = np.where(has_rows, self.starts + count - 1, 0)
+        return self.values[pos] if len(self.values) else np.zeros(len(pos)), has_rows
+
+
+class MarketSnapshot:
+    """
+    Precomputed, per-card view of the price history.
+
+    The history is sorted by (card, date) once; every market metric window
+    (1d, 7d, ..., all-time) is then answered from the same arrays instead of
+    re-sorting and re-grouping the full DataFrame.
+    """
+
+    def __init__(self, price_history: pd.DataFrame, card_metadata: pd.DataFrame) -> None:
+        df = price_history.sort_values(['tcgPlayerId', 'date'], kind='mergesort')
+
+        codes, self.card_ids = pd.factorize(df['tcgPlayerId'], sort=True)
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+        self.max_date = df['date'].max()
+
+        self.market = _CardBlocks(codes, dates, df['market'].to_numpy(dtype=float), len(self.card_ids))
+        self.volume = (
+            _CardBlocks(codes, dates, df['volume'].to_numpy(dtype=float), len(self.card_ids))
+            if 'volume' in df.columns else None
+        )
+
+        # Set of each card (-1 when the card has no metadata / no set)
+        set_names = (
+            card_metadata.drop_duplicates('tcgPlayerId')
+                         .set_index('tcgPlayerId')['setName']
+                         .reindex(self.card_ids)
+                         .astype(object)     # plain set names, even from a categorical column
+        )
+        self.set_codes, self.set_names = pd.factorize(set_names, sort=True)
+
+        # Latest row date per card, regardless of which columns are filled in
+        self._last_date = np.full(len(self.card_ids), np.datetime64('NaT'), dtype='datetime64[ns]')
+        if len(codes):
+            ends = np.searchsorted(codes, np.arange(len(self.card_ids)), side='right')
+            self._last_date = dates[ends - 1]
+
+    def cutoff(self, days: Optional[int]) -> Optional[np.datetime64]:
+        """Start of an N-day window, or None for all-time."""
+        if _is_all_time(days):
+            return None
+        return np.datetime64(self.max_date - timedelta(days=days), 'ns')
+
+    # -------------------- METRICS --------------------
+    def total_market_value(self) -> float:
+        values, valid = self.market.latest()
+        return values[valid].sum()
+
+    def change_totals(self, days: Optional[int]) -> Tuple[float, float]:
+        """(latest, past) market totals over the cards priced at both points."""
+        latest, latest_valid = self.market.latest()
+        if _is_all_time(days):
+            past, past_valid = self.market.earliest()
+        else:
+            past, past_valid = self.market.as_of(self.cutoff(days))
+
+        common = latest_valid & past_valid
+        return latest[common].sum(), past[common].sum()
+
+    def set_changes(self, days: Optional[int]) -> pd.Series:
+        """Percentage change of each set's total market price within the window."""
+        since = self.cutoff(days)
+        earliest, valid = self.market.earliest(since)
+        latest, _ = self.market.latest(since)
+
+        valid &= self.set_codes >= 0
+        codes = self.set_codes[valid]
+        start_total = pd.Series(earliest[valid]).groupby(codes).sum()
+        end_total = pd.Series(latest[valid]).groupby(codes).sum()
+
+        start_total = start_total[start_total > 0]
+        change = (end_total[start_total.index] - start_total) / start_total * 100
+        change.index = self.set_names[change.index]
+        return change
+
+    def active_listings(self, days: Optional[int]) -> float:
+        """Sum of each card's latest volume within the window."""
+        if self.volume is None:
+            raise KeyError('volume')
+        values, valid = self.volume.latest(self.cutoff(days))
+        return values[valid].sum()
+
+    def has_rows_since(self, days: Optional[int]) -> bool:
+        since = self.cutoff(days)
+        if since is None:
+            return len(self.card_ids) > 0
+        return bool((self._last_date >= since).any())
 
 
 class MarketCalculator:
@@ -12,24 +156,54 @@ class MarketCalculator:
     card_metadata: pd.DataFrame
 
     def __init__(self, price_history_df: pd.DataFrame, card_metadata_df: pd.DataFrame) -> None:
-        self.price_history = price_history_df.copy()
-        self.card_metadata = card_metadata_df.copy()
+        self._data_version = 0
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._snapshot_version = -1
+        self.reload(price_history_df, card_metadata_df)
 
-        # Ensure date is clean datetime
-        self.price_history['date'] = (
-            pd.to_datetime(self.price_history['date'], errors='coerce')
-              .dt.tz_localize(None)
-        )
+    def reload(self, price_history_df: Optional[pd.DataFrame] = None, card_metadata_df: Optional[pd.DataFrame] = None) -> None:
+        """
+        Swap in new data; the market snapshot is rebuilt on next use.
+
+        The frames are only read, so they are kept by reference. The price
+        history is copied only when its dates still need converting.
+        """
+        if price_history_df is not None:
+            self.price_history = price_history_df
+
+            # Ensure date is clean datetime
+            if not pd.api.types.is_datetime64_dtype(price_history_df['date']):
+                self.price_history = price_history_df.copy()
+                self.price_history['date'] = (
+                    pd.to_datetime(self.price_history['date'], errors='coerce')
+                      .dt.tz_localize(None)
+                )
+        if card_metadata_df is not None:
+            self.card_metadata = card_metadata_df
+
+        self._data_version += 1
+
+    @property
+    def data_version(self) -> int:
+        """Bumped by every reload(); keys the memoized method results."""
+        return self._data_version
+
+    @property
+    def snapshot(self) -> MarketSnapshot:
+        """Per-card arrays for the current data, built once per data version."""
+        if self._snapshot is None or self._snapshot_version != self._data_version:
+            self._snapshot = MarketSnapshot(self.price_history, self.card_metadata)
+            self._snapshot_version = self._data_version
+        return self._snapshot
 
     # ---------------------------------------------------------
     # TOTAL MARKET VALUE
     # ---------------------------------------------------------
-    @lru_cache(maxsize=32)
+    @memoized_method()
     def calculate_total_market_value(self) -> Dict[str, Any]:
         """Latest total market value"""
         try:
-            latest_prices = self.price_history.sort_values('date').groupby('tcgPlayerId').last()
-            total_value = latest_prices['market'].sum()
+            total_value = self.snapshot.total_market_value()
         except Exception:
             total_value = 0
 
@@ -46,35 +220,15 @@ class MarketCalculator:
     # ---------------------------------------------------------
     # N-DAY OR ALL-TIME MARKET CHANGE
     # ---------------------------------------------------------
+    @memoized_method()
     def calculate_change(self, days: Optional[int] = -1) -> Dict[str, Any]:
         """
         Calculate market change.
-        days=None means all-time.
+        days=None or -1 means all-time.
         """
 
-        df = self.price_history.sort_values("date")
-
         try:
-            # Latest price
-            latest = df.groupby('tcgPlayerId').last()['market']
-
-            if days is -1:
-                # Use earliest available price
-                past = df.groupby('tcgPlayerId').first()['market']
-            else:
-                comparison_date = df['date'].max() - timedelta(days=days)
-                past = (
-                    df[df['date'] <= comparison_date]
-                      .sort_values("date")
-                      .groupby('tcgPlayerId')
-                      .last()['market']
-                )
-
-            # Align card IDs
-            common = latest.index.intersection(past.index)
-
-            latest_total = latest[common].sum()
-            past_total = past[common].sum()
+            latest_total, past_total = self.snapshot.change_totals(days)
 
             if past_total <= 0:
                 raise ValueError("Invalid past market value")
@@ -110,52 +264,26 @@ class MarketCalculator:
     # ---------------------------------------------------------
     # BEST PERFORMING SET (N-DAY OR ALL-TIME)
     # ---------------------------------------------------------
+    @memoized_method()
     def calculate_best_performing_set(self, days: Optional[int] = -1) -> Dict[str, Any]:
         """
         Best performing set over N days or all-time.
-        days=-1 means all-time.
+        days=None or -1 means all-time.
         """
 
-        df = self.price_history.sort_values("date")
-
         try:
-            if days is -1:
-                recent = df
-            else:
-                cutoff = df['date'].max() - timedelta(days=days)
-                recent = df[df['date'] >= cutoff]
-
-            prices_with_sets = recent.merge(
-                self.card_metadata[['tcgPlayerId', 'setName']],
-                on='tcgPlayerId',
-                how='left'
-            )
-
-            prices_with_sets.dropna(subset=['setName'], inplace=True)
-
-            performances: List[Dict[str, Any]] = []
-
-            for set_name in prices_with_sets['setName'].unique():
-                set_data = prices_with_sets[prices_with_sets['setName'] == set_name]
-
-                earliest = set_data.groupby('tcgPlayerId').first()['market']
-                latest = set_data.groupby('tcgPlayerId').last()['market']
-
-                if len(earliest) == 0 or earliest.sum() <= 0:
-                    continue
-
-                change = ((latest.sum() - earliest.sum()) / earliest.sum()) * 100
-                performances.append({'set': set_name, 'change_pct': change})
+            performances = self.snapshot.set_changes(days)
 
-            if not performances:
+            if performances.empty:
                 return {'set_name': 'N/A', 'change_pct': 0, 'formatted': 'N/A'}
 
-            best = max(performances, key=lambda x: x['change_pct'])
+            best_set = performances.idxmax()
+            best_change = performances[best_set]
 
             return {
-                'set_name': best['set'],
-                'change_pct': best['change_pct'],
-                'formatted': f"{best['set']} (+{best['change_pct']:.1f}%)"
+                'set_name': best_set,
+                'change_pct': best_change,
+                'formatted': f"{best_set} (+{best_change:.1f}%)"
             }
 
         except Exception:
@@ -164,29 +292,18 @@ class MarketCalculator:
     # ---------------------------------------------------------
     # ACTIVE LISTINGS (N-DAY OR ALL-TIME)
     # ---------------------------------------------------------
+    @memoized_method()
     def count_active_listings(self, days: Optional[int] = -1) -> Dict[str, Any]:
         """
         Count active listings.
-        days=-1 means all-time.
+        days=None or -1 means all-time.
         """
 
         try:
-            if days is -1:
-                active = self.price_history
-            else:
-                cutoff = self.price_history['date'].max() - timedelta(days=days)
-                active = self.price_history[self.price_history['date'] >= cutoff]
-
-            if active.empty:
+            if not self.snapshot.has_rows_since(days):
                 return {'count': 0, 'formatted': '0'}
 
-            latest = (
-                active.sort_values('date')
-                      .groupby('tcgPlayerId')
-                      .last()
-            )
-
-            count = latest['volume'].sum()
+            count = self.snapshot.active_listings(days)
 
         except Exception:
             count = 0
@@ -196,6 +313,7 @@ class MarketCalculator:
     # ---------------------------------------------------------
     # TOP MOVERS (N-DAY OR ALL-TIME)
     # ---------------------------------------------------------
+    @memoized_method()
     def calculate_top_movers(self, days: Optional[int] = 1, n: int = 5, min_volume: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Calculate top gainers and losers over the past `days`.
@@ -204,11 +322,11 @@ class MarketCalculator:
         if self.price_history.empty:
             return {'gainers': [], 'losers': []}
 
-        df = self.price_history.sort_values('date')
+        df = self.price_history.sort_values('date', kind='mergesort')
 
         # Filter by days
         if days is None:
-            period_data = df.copy()
+            period_data = df
         else:
             cutoff = df['date'].max() - timedelta(days=days)
             period_data = df[df['date'] >= cutoff]
@@ -216,59 +334,64 @@ class MarketCalculator:
         if period_data.empty:
             return {'gainers': [], 'losers': []}
 
-        changes: List[Dict[str, Any]] = []
-
-        for card_id in period_data['tcgPlayerId'].unique():
-            card_data = period_data[period_data['tcgPlayerId'] == card_id].sort_values('date')
-
-            if len(card_data) < 2:
-                continue
-
-            start_price = card_data.iloc[0]['market']
-            end_price = card_data.iloc[-1]['market']
+        # One grouped pass: first/last price, row count and volume per card.
+        # Rows are date-ordered, so head/tail give the period's start/end price.
+        grouped = period_data.groupby('tcgPlayerId', sort=False)
+        start_price = grouped.head(1).set_index('tcgPlayerId')['market']
+        card_ids = start_price.index
 
-            if start_price <= 0:
-                continue
+        movers = pd.DataFrame({
+            'start_price': start_price,
+            'end_price': grouped.tail(1).set_index('tcgPlayerId')['market'].reindex(card_ids),
+            'rows': grouped.size().reindex(card_ids),
+        })
 
-            if min_volume is not None and 'volume' in card_data.columns:
-                if card_data['volume'].sum() < min_volume:
-                    continue
+        keep = (movers['rows'] >= 2) & ~(movers['start_price'] <= 0)
+        if min_volume is not None and 'volume' in period_data.columns:
+            keep &= ~(grouped['volume'].sum().reindex(card_ids) < min_volume)
+        movers = movers[keep]
 
-            change_pct = ((end_price - start_price) / start_price) * 100
-            change_value = end_price - start_price
-
-            meta = self.card_metadata[self.card_metadata['tcgPlayerId'] == card_id]
-            if not meta.empty:
-                name = meta.iloc[0]['name']
-                set_name = meta.iloc[0]['setName']
-            else:
-                name = str(card_id)
-                set_name = "Unknown"
-
-            changes.append({
-                'card_id': card_id,
-                'name': name,
-                'set': set_name,
-                'current_price': end_price,
-                'change_pct': change_pct,
-                'change_value': change_value,
-                'change_pct_formatted': f"{'+' if change_pct >= 0 else ''}{change_pct:.1f}%",
-                'change_value_formatted': f"{'+' if change_value >= 0 else ''}${change_value:.2f}"
-            })
-
-        if not changes:
+        if movers.empty:
             return {'gainers': [], 'losers': []}
 
-        df_changes = pd.DataFrame(changes)
+        # Single metadata join for name / set
+        meta = (
+            self.card_metadata.drop_duplicates('tcgPlayerId')
+                .set_index('tcgPlayerId')[['name', 'setName']]
+                .reindex(movers.index)
+        )
+        known = movers.index.isin(self.card_metadata['tcgPlayerId'])
+
+        df_changes = pd.DataFrame({
+            'card_id': movers.index,
+            'name': np.where(known, meta['name'], movers.index.astype(str)),
+            'set': np.where(known, meta['setName'], "Unknown"),
+            'current_price': movers['end_price'].to_numpy(),
+            'change_pct': ((movers['end_price'] - movers['start_price']) / movers['start_price'] * 100).to_numpy(),
+            'change_value': (movers['end_price'] - movers['start_price']).to_numpy(),
+        })
 
         cutoff_gain = df_changes['change_pct'].nlargest(n).min()
         cutoff_loss = df_changes['change_pct'].nsmallest(n).max()
 
-        gainers = df_changes[df_changes['change_pct'] >= cutoff_gain].sort_values('change_pct', ascending=False).to_dict('records')
-        losers  = df_changes[df_changes['change_pct'] <= cutoff_loss].sort_values('change_pct', ascending=True).to_dict('records')
+        gainers = df_changes[df_changes['change_pct'] >= cutoff_gain].sort_values('change_pct', ascending=False)
+        losers  = df_changes[df_changes['change_pct'] <= cutoff_loss].sort_values('change_pct', ascending=True)
+
+        return {'gainers': self._format_movers(gainers), 'losers': self._format_movers(losers)}
 
-        return {'gainers': gainers, 'losers': losers}
+    @staticmethod
+    def _format_movers(movers: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Add display strings to the (already selected) mover rows."""
+        movers = movers.copy()
+        movers['change_pct_formatted'] = [
+            f"{'+' if pct >= 0 else ''}{pct:.1f}%" for pct in movers['change_pct']
+        ]
+        movers['change_value_formatted'] = [
+            f"{'+' if value >= 0 else ''}${value:.2f}" for value in movers['change_value']
+        ]
+        return movers.to_dict('records')
 
+    @memoized_method()
     def get_all_market_metrics(self) -> Dict[str, Any]:
         """Return all major market metrics across all time windows."""
         return {
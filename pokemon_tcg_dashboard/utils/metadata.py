@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class MetadataRepository:
+    """
+    Card metadata loaded once, with hash indexes on `tcgPlayerId` and `id`.
+
+    Both indexes map an id to its row position, so single lookups are
+    dictionary hits and batch lookups one pass over the ids; no frame is
+    filtered or re-indexed per call. A card's record is built on first use and
+    kept; callers get a shallow copy (a plain dict, JSON safe), so changing a
+    returned record never alters the cache. When an id appears more than
+    once, its first row wins.
+
+    Args:
+        card_metadata_df (pd.DataFrame): Metadata with `tcgPlayerId` and `id`.
+    """
+
+    def __init__(self, card_metadata_df: pd.DataFrame) -> None:
+        self.reload(card_metadata_df)
+
+    def reload(self, card_metadata_df: pd.DataFrame) -> None:
+        """Rebuild the indexes for new metadata and drop cached records."""
+        self.frame = card_metadata_df
+        self._by_tcgplayer_id = self._first_rows(card_metadata_df["tcgPlayerId"])
+        self._by_id = self._first_rows(card_metadata_df["id"]) if "id" in card_metadata_df.columns else {}
+        self._records: Dict[int, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _first_rows(ids: pd.Series) -> Dict[Any, int]:
+        values = ids.astype(object).tolist()
+        rows: Dict[Any, int] = {}
+        for row, value in enumerate(values):
+            rows.setdefault(value, row)
+        return rows
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __contains__(self, card_id: Any) -> bool:
+        return self.row(card_id) is not None
+
+    # -------------------- INDEXES --------------------
+    def row(self, card_id: Any) -> Optional[int]:
+        """Row position of a tcgPlayerId (int or numeric string); None if unknown."""
+        try:
+            return self._by_tcgplayer_id.get(int(card_id))
+        except (TypeError, ValueError):
+            return None
+
+    def rows(self, card_ids: Iterable[Any]) -> np.ndarray:
+        """Row position of each tcgPlayerId, in order; -1 where unknown."""
+        positions = [self.row(card_id) for card_id in card_ids]
+        return np.array([-1 if p is None else p for p in positions], dtype=np.int64)
+
+    # -------------------- LOOKUPS --------------------
+    def _cached_record(self, row: int) -> Dict[str, Any]:
+        record = self._records.get(row)
+        if record is None:
+            record = self.frame.iloc[[row]].to_dict("records")[0]
+            self._records[row] = record
+        return record
+
+    def _record(self, row: int) -> Dict[str, Any]:
+        return dict(self._cached_record(row))
+
+    def get(self, card_id: Any) -> Optional[Dict[str, Any]]:
+        """Metadata record (a copy) of one card by tcgPlayerId, or None."""
+        row = self.row(card_id)
+        return None if row is None else self._record(row)
+
+    def get_by_id(self, metadata_id: Any) -> Optional[Dict[str, Any]]:
+        """Metadata record (a copy) of one card by its `id`, or None."""
+        row = self._by_id.get(metadata_id)
+        return None if row is None else self._record(row)
+
+    def value(self, card_id: Any, column: str, default: Any = None) -> Any:
+        """One field of one card; `default` if the card is unknown."""
+        row = self.row(card_id)
+        return default if row is None else self._cached_record(row).get(column, default)
+
+    def get_many(self, card_ids: Iterable[Any]) -> List[Optional[Dict[str, Any]]]:
+        """`get` for many cards, in order."""
+        return [self.get(card_id) for card_id in card_ids]
+
+    def frame_for(self, card_ids: Optional[Iterable[Any]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Metadata rows of the known cards among `card_ids` (all cards when None),
+        in metadata order like a `tcgPlayerId.isin(card_ids)` filter.
+        """
+        df = self.frame
+        if card_ids is not None:
+            rows = np.unique(self.rows(card_ids))
+            df = df.iloc[rows[rows >= 0]]
+        return df if columns is None else df[list(columns)]
@@ -3,6 +3,8 @@ import numpy as np
 from typing import Dict, Any, Optional, Union
 from datetime import datetime, timedelta
 
+from utils.asof import AsOfPriceIndex
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -22,11 +24,13 @@ class PortfolioCalculator:
             card_metadata_df (pd.DataFrame): Metadata with ['id', 'set', 'rarity'].
         """
 
-        self.price_history = price_history_df.copy()   
-        self.card_metadata = card_metadata_df.copy()
+        self.card_metadata = card_metadata_df
         self.portfolio = portfolio_df.copy()
 
-        self.price_history = self.price_history.merge(
+        # Only the held cards' history is ever needed, so the working set is
+        # scoped to them instead of copying the whole market.
+        held_ids = self.portfolio['tcgPlayerId'].unique()
+        self.price_history = price_history_df[price_history_df['tcgPlayerId'].isin(held_ids)].merge(
             self.card_metadata[['id', 'tcgPlayerId']],
             on='tcgPlayerId',
             how='left'
@@ -43,6 +47,13 @@ class PortfolioCalculator:
               .dt.tz_localize(None)
         )
 
+        # Sorted once by (card, date); per-card histories are slices of it
+        self.price_history = self.price_history.sort_values(['tcgPlayerId', 'date'], kind='mergesort', ignore_index=True)
+        self._card_histories: Dict[Any, pd.DataFrame] = dict(
+            tuple(self.price_history.groupby('tcgPlayerId', sort=False))
+        )
+        self._prices = AsOfPriceIndex(self.price_history)
+
         logger.debug(f"self.portfolio \n {self.portfolio}")
     
     def format_value(self, value: float, sign: str = "") -> str:
@@ -65,25 +76,24 @@ class PortfolioCalculator:
         If days=N → uses only prices from N days ago to today.
         """
 
-        df = self.price_history.copy()
-
         # Apply cutoff filter only if days is provided
-        if days is not None:
-            cutoff = datetime.now() - timedelta(days=days)
-            df = df[df["date"] >= cutoff]
-
-        if df.empty:
-            return {}
-
-        # Sort by date and take the most recent price per card
-        latest_prices = (
-            df.sort_values("date")
-            .groupby("tcgPlayerId", as_index=False)
-            .last()
-        )
+        cutoff = datetime.now() - timedelta(days=days) if days is not None else None
+
+        return self._prices.lookup_dict(self._prices.card_ids, min_date=cutoff)
+
+    def _lot_prices(self, prices: Dict[Any, float], default: Union[float, pd.Series] = 0.0) -> pd.Series:
+        """
+        Price of every portfolio lot, looked up by tcgPlayerId in one pass.
+
+        Lots whose card is missing from `prices` get `default` (a scalar, or a
+        Series aligned with the portfolio such as its buy prices).
+        """
+        card_ids = self.portfolio["tcgPlayerId"]
+        return card_ids.map(prices).where(card_ids.isin(prices.keys()), default)
 
-        # Convert to dictionary
-        return latest_prices.set_index("tcgPlayerId")["market"].to_dict()
+    def _lot_values(self, prices: Dict[Any, float], default: Union[float, pd.Series] = 0.0) -> pd.Series:
+        """Quantity x price of every portfolio lot."""
+        return self._lot_prices(prices, default) * self.portfolio["quantity"]
 
 
     # -------------------------------------------------------------
@@ -119,7 +129,7 @@ class PortfolioCalculator:
             }
         
         current_prices = self.get_current_prices(days=None)  # always latest
-        total_value = sum(current_prices.get(row["tcgPlayerId"], 0) * row["quantity"] for _, row in self.portfolio.iterrows())
+        total_value = self._lot_values(current_prices).sum(skipna=False)
         
         if days is None:
             return {
@@ -132,7 +142,7 @@ class PortfolioCalculator:
             }
         
         past_prices = self.get_current_prices(days=days)
-        past_value = sum(past_prices.get(row["tcgPlayerId"], 0) * row["quantity"] for _, row in self.portfolio.iterrows())
+        past_value = self._lot_values(past_prices).sum(skipna=False)
         
         if past_value == 0:
             percent_change = 0.0 
@@ -170,16 +180,15 @@ class PortfolioCalculator:
             }
 
         current_prices = self.get_current_prices(days=None)
-        total_current = sum(current_prices.get(row["tcgPlayerId"], 0) * row["quantity"] for _, row in self.portfolio.iterrows())
+        total_current = self._lot_values(current_prices).sum(skipna=False)
+        buy_prices = self.portfolio["buy_price"]
 
         if days is None:
-            total_cost = sum(row["buy_price"] * row["quantity"] for _, row in self.portfolio.iterrows())
+            total_cost = (buy_prices * self.portfolio["quantity"]).sum(skipna=False)
         else:
             past_prices = self.get_current_prices(days=days)
-            if not past_prices:
-                total_cost = sum(row["buy_price"] * row["quantity"] for _, row in self.portfolio.iterrows())
-            else:
-                total_cost = sum(past_prices.get(row["tcgPlayerId"], row["buy_price"]) * row["quantity"] for _, row in self.portfolio.iterrows())
+            # Cards without a past price are valued at what was paid for them
+            total_cost = self._lot_values(past_prices, default=buy_prices).sum(skipna=False)
 
         gain_loss_value = total_current - total_cost
         gain_loss_pct = 0.0 if total_cost == 0 else (gain_loss_value / total_cost) * 100
@@ -246,8 +255,8 @@ class PortfolioCalculator:
 
         twr_list = []
         for card_id in self.portfolio["tcgPlayerId"].unique():
-            card_prices = self.price_history[self.price_history["tcgPlayerId"] == card_id].sort_values("date")
-            if len(card_prices) < 2:
+            card_prices = self._card_histories.get(card_id)
+            if card_prices is None or len(card_prices) < 2:
                 continue
             period_returns = card_prices["market"].pct_change().dropna()
             twr_list.append((1 + period_returns).prod() - 1)
@@ -299,7 +308,7 @@ class PortfolioCalculator:
         if total_cards == 0:
             return {'score': 0, 'level': 'low', 'description': 'No cards in portfolio.'}
         
-        set_shares = portfolio_with_meta.groupby('setId')['quantity'].sum() / total_cards
+        set_shares = portfolio_with_meta.groupby('setId', observed=True)['quantity'].sum() / total_cards
         herfindahl = (set_shares ** 2).sum()
         diversity_score = (1 - herfindahl) * 100
         diversity_score *= (1 + unique_sets / 10) * (1 + unique_rarities / 5)
@@ -322,15 +331,13 @@ class PortfolioCalculator:
             return {'volatility': 0, 'level': 'low', 'description': 'No data available.'}
         
         portfolio_cards = self.portfolio['tcgPlayerId'].unique()
-        portfolio_prices = self.price_history[self.price_history['tcgPlayerId'].isin(portfolio_cards)]
         volatilities = []
 
         for card_id in portfolio_cards:
-            card_prices = portfolio_prices[portfolio_prices['tcgPlayerId'] == card_id].sort_values('date')
+            card_prices = self._card_histories.get(card_id)
 
-            if len(card_prices) >= 2:
-                card_prices['returns'] = card_prices['market'].pct_change()
-                vol = card_prices['returns'].std()
+            if card_prices is not None and len(card_prices) >= 2:
+                vol = card_prices['market'].pct_change().std()
 
                 if vol is not None:
                     volatilities.append(vol)
@@ -358,14 +365,14 @@ class PortfolioCalculator:
         
         current_prices = self.get_current_prices()
 
-        self.portfolio['card_value'] = self.portfolio.apply(lambda row: current_prices.get(row['tcgPlayerId'], 0) * row['quantity'], axis=1)
-        total_value = self.portfolio['card_value'].sum()
+        card_value = self._lot_values(current_prices)
+        total_value = card_value.sum()
         
         if total_value == 0:
             return {'exposure': 0, 'level': 'low', 'description': 'No market exposure.'}
         
-        max_position_pct = float((self.portfolio['card_value'].max() / total_value) * 100)
-        top_3_pct = float((self.portfolio.nlargest(3, 'card_value')['card_value'].sum() / total_value) * 100)
+        max_position_pct = float((card_value.max() / total_value) * 100)
+        top_3_pct = float((card_value.nlargest(3).sum() / total_value) * 100)
 
         if max_position_pct > 30 or top_3_pct > 60:
             level = "high"
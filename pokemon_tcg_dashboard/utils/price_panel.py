@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Optional, Union
+
+import logging
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+
+
+class PricePanel:
+    """
+    Dense date x card price matrix on a regular daily grid.
+
+    Each card's last price of every day is placed on one daily grid shared by
+    all cards and carried forward over days without a price (NaN before the
+    card's first price). Values are float32, about 7 significant digits,
+    which is exact to the cent for prices below $100,000. `observed` marks
+    the cells that hold a price of that day rather than a carried one.
+
+    Args:
+        price_history_df (pd.DataFrame): Price history with `date`, `tcgPlayerId`
+                                         and the value column.
+        value_column (str): Column holding the price. Rows where it is NaN are skipped.
+        filters (dict, optional): Only use rows where column == value, e.g.
+                                  {"condition": "Near Mint"} or {"grade": "PSA 10"}.
+        card_column (str): Column identifying the card.
+    """
+
+    def __init__(self, price_history_df: pd.DataFrame, value_column: str = "market",
+                 filters: Optional[Dict[str, Any]] = None, card_column: str = "tcgPlayerId") -> None:
+        df = price_history_df
+        for column, value in (filters or {}).items():
+            df = df[df[column] == value]
+        df = df[df[value_column].notna()].sort_values("date", kind="mergesort")
+
+        codes, self.card_ids = pd.factorize(df[card_column], sort=True)
+        days = df["date"].dt.normalize().to_numpy(dtype="datetime64[D]")
+        prices = df[value_column].to_numpy(dtype=np.float32)
+
+        if len(days):
+            self.dates = pd.date_range(days.min(), days.max(), freq="D")
+        else:
+            self.dates = pd.DatetimeIndex([])
+        n_dates, n_cards = len(self.dates), len(self.card_ids)
+
+        # Last row of each (day, card)
+        rows = (days - days.min()).astype(np.int64) if len(days) else np.array([], dtype=np.int64)
+        keys = rows * n_cards + codes
+        _, last_of_key = np.unique(keys[::-1], return_index=True)
+        last_of_key = len(keys) - 1 - last_of_key
+
+        self.observed = np.zeros((n_dates, n_cards), dtype=bool)
+        self.observed[rows[last_of_key], codes[last_of_key]] = True
+        raw = np.full((n_dates, n_cards), np.nan, dtype=np.float32)
+        raw[rows[last_of_key], codes[last_of_key]] = prices[last_of_key]
+
+        # Forward fill: every cell takes the value of its card's latest observed row
+        source_row = np.where(self.observed, np.arange(n_dates)[:, None], 0)
+        source_row = np.maximum.accumulate(source_row, axis=0) if n_dates else source_row
+        self.values = raw[source_row, np.arange(n_cards)]
+
+        self.first_rows = self.observed.argmax(axis=0)
+        self.last_rows = n_dates - 1 - self.observed[::-1].argmax(axis=0)
+        self._card_positions = pd.Index(self.card_ids)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def last_dates(self) -> pd.DatetimeIndex:
+        """Each card's latest day with a price."""
+        return self.dates[self.last_rows]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.observed.nbytes
+
+    # -------------------- POSITIONS --------------------
+    def card_positions(self, card_ids: Iterable[Any]) -> np.ndarray:
+        """Column of each card; -1 for cards without prices."""
+        return self._card_positions.get_indexer(list(card_ids))
+
+    def date_position(self, date: DateLike) -> int:
+        """Row of the latest grid day on or before `date`; -1 if it is before the grid."""
+        day = pd.Timestamp(date).normalize()
+        return int(self.dates.searchsorted(day, side="right")) - 1
+
+    # -------------------- SLICES --------------------
+    def as_of(self, date: Optional[DateLike] = None, card_ids: Optional[Iterable[Any]] = None) -> np.ndarray:
+        """
+        Latest price of each card on or before `date` (default: the last grid day).
+
+        Returns:
+            np.ndarray (float32): One price per card (all cards when `card_ids`
+                                  is None); NaN where the card has no price yet
+                                  or is unknown.
+        """
+        row = len(self.dates) - 1 if date is None else self.date_position(date)
+        if card_ids is None:
+            return self.values[row].copy() if row >= 0 else np.full(len(self.card_ids), np.nan, dtype=np.float32)
+
+        cols = self.card_positions(card_ids)
+        result = np.full(len(cols), np.nan, dtype=np.float32)
+        if row >= 0:
+            found = cols >= 0
+            result[found] = self.values[row, cols[found]]
+        return result
+
+    def window(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+               card_ids: Optional[Iterable[Any]] = None, fill: bool = True) -> pd.DataFrame:
+        """
+        Daily prices between `start` and `end` (inclusive) as a date x card frame.
+
+        Args:
+            start, end: Window bounds; None means the start / end of the grid.
+            card_ids: Cards (columns) to include; None for all. Unknown cards
+                      are dropped.
+            fill (bool): Carry prices forward over days without one. With False
+                         only observed prices are kept (NaN elsewhere).
+        """
+        lo = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start).normalize(), side="left"))
+        hi = len(self.dates) if end is None else self.date_position(end) + 1
+
+        values = self.values[lo:hi]
+        if not fill:
+            values = np.where(self.observed[lo:hi], values, np.nan)
+        columns = self.card_ids
+        if card_ids is not None:
+            cols = self.card_positions(card_ids)
+            cols = cols[cols >= 0]
+            values, columns = values[:, cols], self.card_ids[cols]
+        return pd.DataFrame(values, index=self.dates[lo:hi], columns=columns, copy=False)
+
+    def series(self, card_id: Any, fill: bool = True) -> pd.Series:
+        """One card's daily prices over the whole grid."""
+        frame = self.window(card_ids=[card_id], fill=fill)
+        return frame.iloc[:, 0] if frame.shape[1] else pd.Series(dtype=np.float32, index=self.dates)
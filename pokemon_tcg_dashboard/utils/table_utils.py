@@ -1,4 +1,4 @@
-from global_variables import CARD_METADATA_DF, PRICE_HISTORY_DF
+import global_variables
 import pandas as pd
 import numpy as np
 
@@ -24,13 +24,11 @@ def calculate_top_movers(name:str=None, set_name:str=None, rarity:str=None, days
 
     COLS = ['name', 'setName', 'current_price', 'price_change', 'pct_change']
     name = name.strip() if name else None
-    price_history_df = PRICE_HISTORY_DF.copy()
-    price_history_df = price_history_df.set_index('date')
-    price_history_df = price_history_df[price_history_df['condition']=='Near Mint']
+    panel = global_variables.NEAR_MINT_PANEL
     if days == -1:
-        days = (price_history_df.index.max() - price_history_df.index.min()).days
+        days = (panel.dates[-1] - panel.dates[0]).days
 
-    meta_df = CARD_METADATA_DF.copy()
+    meta_df = global_variables.CARD_METADATA_DF
     
     if name:
         meta_df = meta_df[meta_df['name'].str.contains(name, case=False)]
@@ -47,37 +45,20 @@ def calculate_top_movers(name:str=None, set_name:str=None, rarity:str=None, days
         else:
             meta_df = meta_df[meta_df['rarity']==rarity]
 
-    card_ids = meta_df['tcgPlayerId'].unique()
-
-    df = price_history_df[price_history_df['tcgPlayerId'].isin(card_ids)]
-
- # Ensure datetime index
-    df.index = pd.to_datetime(df.index)
-
-    # 3. Compute dates
-    max_date = df.index.max()
+    # Latest Near Mint price per card, and the price N days before the
+    # selection's latest date, read from the daily price panel
+    card_ids = meta_df['tcgPlayerId'].to_numpy()
+    cols = panel.card_positions(card_ids)
+    priced = cols[cols >= 0]
+    max_date = panel.dates[panel.last_rows[priced].max()] if len(priced) else panel.dates[-1]
     past_date = max_date - pd.Timedelta(days=days)
 
-    # 4. Latest price per card
-    latest = (
-        df.sort_values(['tcgPlayerId', df.index.name])
-          .groupby('tcgPlayerId')
-          .tail(1)[['tcgPlayerId', 'market']]
-          .rename(columns={'market': 'current_price', 'setName': 'set_name'})
-    )
-
-    # 5. Price N days ago
-    past = (
-        df[df.index <= past_date]
-          .sort_values(['tcgPlayerId', df.index.name])
-          .groupby('tcgPlayerId')
-          .tail(1)[['tcgPlayerId', 'market']]
-          .rename(columns={'market': 'past_price', 'setName': 'set_name'})
-    )
-
-    # 6. Merge with metadata
-    out = meta_df.merge(latest, on='tcgPlayerId', how='left')
-    out = out.merge(past, on='tcgPlayerId', how='left')
+    out = pd.DataFrame({
+        'name': meta_df['name'].to_numpy(),
+        'setName': meta_df['setName'].to_numpy(),
+        'current_price': np.round(panel.as_of(None, card_ids).astype(float), 2),   # float32 panel values rounded back to cents
+        'past_price': np.round(panel.as_of(past_date, card_ids).astype(float), 2),
+    })
 
     # 7. Calculate changes
     out['price_change'] = out['current_price'] - out['past_price']
@@ -105,34 +86,27 @@ def calculate_top_movers(name:str=None, set_name:str=None, rarity:str=None, days
     logger.debug(out[COLS].head(2).to_dict('records'))
     return out[COLS].head(top_n).to_dict('records')
 
-def get_latest_price(card_id, df):
-    today = pd.Timestamp.today().normalize()
-    card_df = df[df["tcgPlayerId"] == card_id]
-    if today in card_df.index:
-        return card_df.loc[today, "market"]
-
-    # 2 — else find the most recent available date BEFORE today
-    earlier = card_df[card_df.index <= today]
-
-    if earlier.empty:
-        return None
-
-    latest_row = earlier.sort_index().tail(1)
-    return latest_row["market"].iloc[0]
+def get_latest_price(card_id, as_of=None):
+    """Near Mint market price of a card on or before `as_of` (default today); None if unknown."""
+    as_of = pd.Timestamp.today().normalize() if as_of is None else as_of
+    price = global_variables.NEAR_MINT_PRICES.lookup([card_id], as_of)[0]
+    return None if np.isnan(price) else price
 
 def calculate_holdings_price_change(data: list[dict]):
-    price_history_df = PRICE_HISTORY_DF.copy()
-    price_history_df = price_history_df.set_index('date')
-    price_history_df = price_history_df[price_history_df['condition'] == 'Near Mint']
+    """
+    Add current price, price change and % change (formatted) to each holding.
 
+    Latest Near Mint prices for all holdings are resolved in one batched
+    lookup. The holding dicts are updated in place and returned.
+    """
     if not data:
         return []
 
-    for card in data:
-        card_df = price_history_df[price_history_df["tcgPlayerId"] == card['tcgPlayerId']]
-        current_price = get_latest_price(card['tcgPlayerId'], card_df)
+    today = pd.Timestamp.today().normalize()
+    current_prices = global_variables.NEAR_MINT_PRICES.lookup([card['tcgPlayerId'] for card in data], today)
 
-        if current_price is not None:
+    for card, current_price in zip(data, current_prices.tolist()):
+        if not np.isnan(current_price):
             price_change = current_price - card['buy_price']
             pct_change = (price_change / card['buy_price']) * 100
             card['current_price'] = f"$ {current_price:,.2f}"
@@ -4,10 +4,16 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+import itertools
+import os
+import time
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.price_panel import PricePanel
 
 def generate_trading_signal(
     card_id: int|str,
@@ -214,6 +220,46 @@ def generate_trading_signal(
 
 
 
+def _series_indicators(
+    prices: np.ndarray,
+    rsi_window: int = 14,
+    ma_windows: Iterable[int] = (5, 15),
+) -> Dict[str, float]:
+    """
+    Indicators of generate_trading_signal_simple for one (gap-free) daily price window.
+
+    Each moving average in `ma_windows` is returned as `ma_<window>`.
+    """
+    days = np.arange(len(prices))
+    series = pd.Series(prices)
+
+    mas = {f"ma_{k}": float(series.rolling(k, min_periods=1).mean().iloc[-1]) for k in ma_windows}
+    slope, intercept = np.polyfit(days, prices, 1)
+    slope_pct = slope / prices[-1] if prices[-1] != 0 else 0.0
+
+    # Element-wise steps in numpy (same values as the pandas operations, far less overhead)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = prices[1:] / prices[:-1] - 1
+    returns = returns[~np.isnan(returns)]
+    vol_daily = float(returns.std(ddof=0)) if len(returns) else 0.0
+
+    delta = np.concatenate(([np.nan], np.diff(prices)))
+    gain = pd.Series(np.where(delta > 0, delta, 0)).rolling(rsi_window, min_periods=1).mean().to_numpy()
+    loss = pd.Series(-np.where(delta < 0, delta, 0)).rolling(rsi_window, min_periods=1).mean().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = gain / np.where(loss == 0, np.nan, loss)
+    rsi = 100 - (100 / (1 + rs))
+    current_rsi = float(rsi[-1]) if not np.isnan(rsi).all() else 50.0
+
+    return {
+        **mas,
+        "slope": float(slope),
+        "slope_pct": float(slope_pct),
+        "vol_daily": vol_daily,
+        "rsi": current_rsi,
+    }
+
+
 def generate_trading_signal_simple(
     card_id: Any,
     price_history: pd.DataFrame,
@@ -272,25 +318,14 @@ def generate_trading_signal_simple(
         return {"signal": "Hold", "confidence": 0.0, "reason": "Insufficient data (need >=5 days)", "target_price": None, "indicators": {}, "net": 0.0}
 
     prices = daily.values
-    days = np.arange(len(prices))
 
     # indicators
-    ma_5 = float(pd.Series(prices).rolling(5, min_periods=1).mean().iloc[-1])
-    ma_15 = float(pd.Series(prices).rolling(15, min_periods=1).mean().iloc[-1])
-    slope, intercept = np.polyfit(days, prices, 1)
-    slope_pct = slope / prices[-1] if prices[-1] != 0 else 0.0
-
-    returns = pd.Series(prices).pct_change().dropna()
-    vol_daily = float(returns.std(ddof=0)) if not returns.empty else 0.0
+    ind = _series_indicators(prices, rsi_window)
+    ma_5, ma_15 = ind["ma_5"], ind["ma_15"]
+    slope, slope_pct = ind["slope"], ind["slope_pct"]
+    vol_daily, current_rsi = ind["vol_daily"], ind["rsi"]
     vol_annual_pct = vol_daily * np.sqrt(252) * 100.0
 
-    delta = pd.Series(prices).diff()
-    gain = delta.where(delta > 0, 0).rolling(rsi_window, min_periods=1).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(rsi_window, min_periods=1).mean()
-    rs = gain / loss.replace(0, np.nan)
-    rsi = 100 - (100 / (1 + rs))
-    current_rsi = float(rsi.iloc[-1]) if not rsi.isna().all() else 50.0
-
     current_price = float(prices[-1])
 
     # scoring
@@ -360,6 +395,253 @@ def generate_trading_signal_simple(
 
 
 
+# Multi-card screener
+
+# Reason strings used by generate_trading_signal, keyed by signal
+SIGNAL_REASONS = {
+    "Strong Buy": "Multiple bullish indicators (MA crossover, trend, RSI)",
+    "Buy": "Bullish momentum and positive indicators",
+    "Hold": "Mixed indicators — no clear direction",
+    "Sell": "Bearish momentum and negative indicators",
+    "Strong Sell": "Multiple bearish indicators (MA crossover, trend, RSI)",
+}
+
+
+def _score_signals(
+    ma_5: np.ndarray,
+    ma_15: np.ndarray,
+    slope_pct: np.ndarray,
+    rsi: np.ndarray,
+    current_price: np.ndarray,
+    vol_daily: np.ndarray,
+    *,
+    slope_threshold: float = 0.001,
+    rsi_oversold: float = 30,
+    rsi_overbought: float = 70,
+    score_band: float = 2,
+    strong_score_band: float = 5,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized version of the scoring rules in generate_trading_signal.
+
+    Takes one indicator value per card (or per day) and returns the net score,
+    signal label and confidence for each. NaN indicators never satisfy a
+    comparison, exactly like the scalar code. The keyword arguments are the
+    rule thresholds; their defaults are the ones generate_trading_signal uses.
+    """
+    bullish = np.zeros(len(ma_5))
+    bearish = np.zeros(len(ma_5))
+
+    # MA crossover
+    ma_up = ma_5 > ma_15
+    bullish += np.where(ma_up, 2, 0)
+    bearish += np.where(ma_up, 0, 2)
+
+    # Trend direction
+    bullish += np.where(slope_pct > slope_threshold, 2, 0)
+    bearish += np.where(slope_pct < -slope_threshold, 2, 0)
+
+    # RSI
+    bullish += np.where(rsi < rsi_oversold, 3, 0)
+    bearish += np.where(rsi > rsi_overbought, 3, 0)
+
+    # Price relative to MA15
+    above_ma = current_price > ma_15
+    bullish += np.where(above_ma, 1, 0)
+    bearish += np.where(above_ma, 0, 1)
+
+    net = bullish - bearish
+    signal = _net_signals(net, score_band, strong_score_band)
+
+    base_conf = np.minimum(100, np.abs(net) / 6 * 100)
+    vol_factor = 1 - np.minimum(1, vol_daily * np.sqrt(252))
+    confidence = np.maximum(0, np.minimum(100, base_conf * np.maximum(0.2, vol_factor)))
+
+    return {"net": net, "signal": signal, "confidence": confidence}
+
+
+def _net_signals(net: np.ndarray, score_band: float = 2, strong_score_band: float = 5) -> np.ndarray:
+    """Signal label of each net score."""
+    return np.select(
+        [net >= strong_score_band, net >= score_band, net <= -strong_score_band, net <= -score_band],
+        ["Strong Buy", "Buy", "Strong Sell", "Sell"],
+        default="Hold",
+    )
+
+
+def _daily_price_matrix(
+    price_history: pd.DataFrame,
+    date_col: str,
+    price_col: str,
+    card_id_col: str,
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Day x card matrix holding each card's last price of each calendar day.
+
+    Returns (matrix, last_day) where `last_day` is each card's latest day with
+    any row, which is where generate_trading_signal ends its window.
+    """
+    dates = pd.to_datetime(price_history[date_col], errors="coerce")
+    try:
+        dates = dates.dt.tz_localize(None)
+    except Exception:
+        pass
+
+    df = pd.DataFrame({
+        "card": price_history[card_id_col].to_numpy(),
+        "day": dates.dt.normalize().to_numpy(),
+        "date": dates.to_numpy(),
+        "price": price_history[price_col].to_numpy(),
+    }).dropna(subset=["day"])
+    df = df.sort_values("date", kind="mergesort")
+
+    last_day = df.groupby("card")["day"].max()
+    daily = df.groupby(["day", "card"])["price"].last().unstack("card")
+    daily = daily.reindex(
+        index=pd.date_range(daily.index.min(), daily.index.max(), freq="D"),
+        columns=last_day.index,
+    )
+    return daily, last_day
+
+
+def screen_trading_signals(
+    price_history: pd.DataFrame | None,
+    lookback_days: int = 90,
+    *,
+    date_col: str = "date",
+    price_col: str = "price",
+    card_id_col: str = "card_id",
+    rsi_window: int = 14,
+    projection_days: int = 30,
+    condition: str | None = None,
+    panel: PricePanel | None = None,
+) -> pd.DataFrame:
+    """
+    Trading signals for every card at once, ranked from strongest buy to strongest sell.
+
+    Applies the same indicators and scoring as generate_trading_signal, but on a
+    (lookback day x card) matrix where each card's column ends on its own latest
+    day, so all cards are scored in one vectorized pass.
+
+    Input:
+        price_history: Required unless `panel` is given. Rows for any number of cards.
+        condition: Optional. Only use rows of this condition (e.g. "Near Mint").
+        panel: Optional. A prebuilt PricePanel (already filtered, e.g. by condition)
+               used instead of `price_history`; card_id is then the panel's card id.
+    Returns:
+        pd.DataFrame, one row per card, with columns card_id, signal, confidence,
+        reason, target_price, net_score and the indicator values.
+    """
+    if panel is not None:
+        if not len(panel.card_ids):
+            return pd.DataFrame(columns=["card_id", "signal", "confidence", "reason", "target_price", "net_score"])
+        daily = panel.window(fill=False).astype(float).round(2)   # float32 prices back to cents
+        last_day = pd.Series(panel.last_dates, index=panel.card_ids)
+        return _screen_daily_prices(daily, last_day, lookback_days, rsi_window, projection_days)
+
+    df = price_history
+
+    # Accept flexible column names
+    if card_id_col not in df.columns and "id" in df.columns:
+        df = df.rename(columns={"id": card_id_col})
+    if price_col not in df.columns:
+        for alt in ["market", "avgPrice", "lastPrice", "price_usd"]:
+            if alt in df.columns:
+                price_col = alt
+                break
+
+    if card_id_col not in df.columns or date_col not in df.columns or price_col not in df.columns:
+        raise KeyError("price_history must contain card_id, date, and price columns")
+
+    if condition is not None:
+        df = df[df["condition"] == condition]
+    if df.empty:
+        return pd.DataFrame(columns=["card_id", "signal", "confidence", "reason", "target_price", "net_score"])
+
+    daily, last_day = _daily_price_matrix(df, date_col, price_col, card_id_col)
+    return _screen_daily_prices(daily, last_day, lookback_days, rsi_window, projection_days)
+
+
+def _screen_daily_prices(
+    daily: pd.DataFrame,
+    last_day: pd.Series,
+    lookback_days: int,
+    rsi_window: int,
+    projection_days: int,
+) -> pd.DataFrame:
+    """Score every column of a day x card matrix; see screen_trading_signals."""
+    # Right-align: row t of card c is day (last_day[c] - lookback_days + 1 + t)
+    end_pos = daily.index.get_indexer(last_day.to_numpy())
+    rows = end_pos[None, :] - lookback_days + 1 + np.arange(lookback_days)[:, None]
+    values = daily.to_numpy()
+    window = np.where(rows >= 0, values[np.clip(rows, 0, None), np.arange(values.shape[1])], np.nan)
+    window = pd.DataFrame(window).ffill()
+
+    valid = window.notna()
+    n_days = valid.sum().to_numpy()
+    prices = window.to_numpy()
+
+    # Moving averages
+    ma_5 = window.rolling(5, min_periods=1).mean().iloc[-1].to_numpy()
+    ma_15 = window.rolling(15, min_periods=1).mean().iloc[-1].to_numpy()
+
+    # Trend slope (least squares over each card's valid days)
+    x = np.where(valid, np.arange(lookback_days)[:, None], np.nan)
+    x_dev = x - np.nanmean(x, axis=0)
+    y_dev = prices - np.nanmean(prices, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.nansum(x_dev * y_dev, axis=0) / np.nansum(x_dev ** 2, axis=0)
+    current_price = prices[-1]
+    slope_pct = np.where(current_price != 0, slope / current_price, 0)
+
+    # Volatility (std of daily returns)
+    vol_daily = window.pct_change(fill_method=None).std(ddof=0).to_numpy()
+    vol_annual_pct = vol_daily * np.sqrt(252) * 100
+
+    # RSI; each card's first day has no change and counts as 0 gain / 0 loss
+    delta = window.diff()
+    gain = delta.where(delta > 0, 0).where(valid).rolling(rsi_window, min_periods=1).mean()
+    loss = (-delta.where(delta < 0, 0)).where(valid).rolling(rsi_window, min_periods=1).mean()
+    rs = gain / loss.replace(0, np.nan)
+    rsi = (100 - (100 / (1 + rs))).iloc[-1].to_numpy()
+
+    scores = _score_signals(ma_5, ma_15, slope_pct, rsi, current_price, vol_daily)
+
+    # Target Price (projected)
+    projected = np.clip(current_price + slope * projection_days, 0.5 * current_price, 1.5 * current_price)
+
+    table = pd.DataFrame({
+        "card_id": last_day.index,
+        "signal": scores["signal"],
+        "confidence": scores["confidence"],
+        "reason": pd.Series(scores["signal"]).map(SIGNAL_REASONS).to_numpy(),
+        "target_price": projected,
+        "net_score": scores["net"],
+        "current_price": current_price,
+        "ma_5": ma_5,
+        "ma_15": ma_15,
+        "trend_slope_per_day": slope,
+        "trend_slope_pct_per_day": slope_pct,
+        "volatility_daily": vol_daily,
+        "volatility_annual_pct": vol_annual_pct,
+        "rsi": rsi,
+        "lookback_days_used": n_days,
+    })
+
+    # Cards with under 5 days of prices get the same "Hold" as generate_trading_signal
+    short = n_days < 5
+    indicator_cols = list(table.columns[table.columns.get_loc("current_price"):-1])
+    table.loc[short, indicator_cols + ["target_price"]] = np.nan
+    table.loc[short, ["signal", "reason"]] = ["Hold", "Insufficient data (need ≥5 days)"]
+    table.loc[short, ["confidence", "net_score"]] = 0.0
+
+    return (
+        table.sort_values(["net_score", "confidence"], ascending=False, kind="mergesort")
+             .reset_index(drop=True)
+    )
+
+
+
 # Backtester
 
 def backtest_trading_signals(
@@ -380,41 +662,261 @@ def backtest_trading_signals(
 
     Returns a dict with summary, trades list and equity curve.
     """
-    ph = price_history.copy()
-    # normalize columns
-    if "card_id" not in ph.columns and "id" in ph.columns:
-        ph = ph.rename(columns={"id": "card_id"})
-    if "price" not in ph.columns:
-        for alt in ["market", "avgPrice", "lastPrice", "price_usd"]:
-            if alt in ph.columns:
-                ph = ph.rename(columns={alt: "price"})
-                break
-    if "date" not in ph.columns:
-        for alt in ["timestamp", "created_at"]:
-            if alt in ph.columns:
-                ph = ph.rename(columns={alt: "date"})
-                break
+    daily_all = _backtest_daily_prices(card_id, price_history, start_date, end_date, lookback_days)
+    result = _backtest_series(daily_all, lookback_days, initial_capital)
 
-    ph["date"] = pd.to_datetime(ph["date"], errors="coerce")
+    return {
+        "card_id": card_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "initial_capital": initial_capital,
+        **result,
+    }
+
+
+def _backtest_columns(columns: pd.Index) -> Tuple[str, str, str]:
+    """Card id, date and price column names of a price history frame."""
+    card_col = "card_id" if "card_id" in columns or "id" not in columns else "id"
+    date_col = next((c for c in ["date", "timestamp", "created_at"] if c in columns), "date")
+    price_col = next((c for c in ["price", "market", "avgPrice", "lastPrice", "price_usd"] if c in columns), "price")
+    return card_col, date_col, price_col
+
+
+def _naive_dates(dates: pd.Series) -> pd.Series:
+    """Dates parsed to datetime (invalid -> NaT) with any timezone dropped."""
+    dates = pd.to_datetime(dates, errors="coerce")
     try:
-        ph["date"] = ph["date"].dt.tz_localize(None)
+        dates = dates.dt.tz_localize(None)
     except Exception:
         pass
-    ph = ph.dropna(subset=["date", "price", "card_id"]).sort_values("date")
+    return dates
+
+
+def _backtest_daily_prices(
+    card_id: Any,
+    price_history: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    lookback_days: int,
+) -> pd.Series:
+    """Last price per observed day for one card inside the backtest period."""
+    # normalize columns (resolved by name, so the full history is never copied)
+    card_col, date_col, price_col = _backtest_columns(price_history.columns)
+
+    # Only this card's rows are normalized, not the whole history
+    dfc = price_history.loc[price_history[card_col] == card_id, [date_col, price_col]]
+    dfc.columns = ["date", "price"]
+    dfc["date"] = _naive_dates(dfc["date"])
+    return _backtest_window(dfc, start_date, end_date, lookback_days)
+
+
+def _backtest_window(
+    dfc: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    lookback_days: int,
+) -> pd.Series:
+    """
+    Daily price series of one card's (date, price) rows inside the backtest period.
 
-    dfc = ph[ph["card_id"] == card_id].copy()
+    The date sort is stable, so same-day rows (different conditions) always
+    keep file order and the last of them sets the day's price. The previous
+    unstable sort broke those ties arbitrarily, so on unfiltered history the
+    trades can differ from the old implementation.
+    """
+    dfc = dfc.dropna(subset=["date", "price"]).sort_values("date", kind="mergesort")
     if dfc.empty:
         raise ValueError("No data for given card_id")
 
     mask = (dfc["date"] >= pd.to_datetime(start_date)) & (dfc["date"] <= pd.to_datetime(end_date))
-    test_data = dfc.loc[mask].sort_values("date").reset_index(drop=True)
+    test_data = dfc.loc[mask].reset_index(drop=True)
     if test_data.empty or len(test_data) < lookback_days + 5:
         raise ValueError("Not enough data in the selected period for backtest")
 
     # daily price series inside backtest window
     test_data["day"] = test_data["date"].dt.normalize()
-    daily_all = test_data.groupby("day")["price"].last().sort_index()
+    return test_data.groupby("day")["price"].last().sort_index()
+
+
+def _backtest_features(
+    daily_all: pd.Series,
+    lookback_days: int,
+    ma_windows: Iterable[int] = (5, 15),
+    rsi_windows: Iterable[int] = (14,),
+) -> Optional[Dict[str, Any]]:
+    """
+    Indicators generate_trading_signal_simple would see on each backtest day, in one pass.
+
+    Day i (for i >= lookback_days) is scored on the calendar window of
+    `lookback_days` days ending at the previous observed day, forward-filled
+    from the first observation inside that window. All windows are slices of
+    one forward-filled calendar series, so MAs, regression slope and RSI come
+    from prefix sums over it instead of refitting every window.
+
+    Returns None when there is no backtest day, otherwise a dict of per-day
+    arrays: window bounds (`first`, `end`, `length`), `current_price`,
+    `slope_pct`, `ma` {window: (ma, exact)} and `rsi` {window: rsi}, plus the
+    forward-filled calendar `prices`.
+    """
+    days = daily_all.index
+    n_steps = len(days) - lookback_days
+    if n_steps <= 0:
+        return None
+
+    # Forward-filled calendar series and its observed days
+    calendar = pd.date_range(days[0], days[-1], freq="D")
+    observed_pos = calendar.get_indexer(days)
+    prices = daily_all.reindex(calendar).ffill().to_numpy(dtype=float)
+    positions = np.arange(len(prices))
+
+    # next_obs[p]: first observed calendar position >= p
+    next_obs = np.full(len(prices) + 1, len(prices))
+    next_obs[observed_pos] = observed_pos
+    next_obs = np.minimum.accumulate(next_obs[::-1])[::-1]
+
+    # Window of each step: calendar positions [first, end]
+    end = observed_pos[lookback_days - 1:len(days) - 1]
+    first = next_obs[np.maximum(end - lookback_days + 1, 0)]
+    length = end - first + 1
+
+    def window_sum(prefix: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        return prefix[hi + 1] - prefix[lo]
+
+    price_sum = np.concatenate(([0.0], np.cumsum(prices)))
+    pos_price_sum = np.concatenate(([0.0], np.cumsum(positions * prices)))
+
+    # Runs of identical prices: rolling means over a constant stretch are exact
+    same_as_prev = np.concatenate(([False], prices[1:] == prices[:-1]))
+    run_start = np.maximum.accumulate(np.where(same_as_prev, 0, positions))
+    run_length = np.minimum(end - run_start[end] + 1, length)
+
+    current_price = prices[end]
+
+    ma = {}
+    for k in ma_windows:
+        k_eff = np.minimum(k, length)
+        exact = run_length >= k_eff
+        ma[k] = (np.where(exact, current_price, window_sum(price_sum, end - k_eff + 1, end) / k_eff), exact)
+
+    # Least-squares slope over each window
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centre = (first + end) / 2.0
+        s_xx = length * (length ** 2 - 1) / 12.0
+        slope = (window_sum(pos_price_sum, first, end) - centre * window_sum(price_sum, first, end)) / s_xx
+        slope_pct = np.where(current_price != 0, slope / current_price, 0.0)
+
+    # RSI over the last `rsi_window` changes; the window's first day counts as no change
+    delta = np.concatenate(([0.0], np.diff(prices)))
+    gain_sum = np.concatenate(([0.0], np.cumsum(np.where(delta > 0, delta, 0.0))))
+    loss_sum = np.concatenate(([0.0], np.cumsum(np.where(delta < 0, -delta, 0.0))))
+    loss_count = np.concatenate(([0], np.cumsum(delta < 0)))
+
+    rsi = {}
+    for w in rsi_windows:
+        rsi_lo = np.maximum(first + 1, end - w + 1)
+        rsi_count = np.minimum(w, length)
+        has_loss = window_sum(loss_count, rsi_lo, end) > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gain = window_sum(gain_sum, rsi_lo, end) / rsi_count
+            loss = window_sum(loss_sum, rsi_lo, end) / rsi_count
+            rsi[w] = np.where(has_loss, 100 - (100 / (1 + gain / loss)), np.nan)
+
+    return {
+        "first": first,
+        "end": end,
+        "length": length,
+        "prices": prices,
+        "current_price": current_price,
+        "slope_pct": slope_pct,
+        "ma": ma,
+        "rsi": rsi,
+    }
+
+
+def _backtest_net(
+    features: Dict[str, Any],
+    ma_short: int = 5,
+    ma_long: int = 15,
+    rsi_window: int = 14,
+    *,
+    slope_threshold: float = 0.001,
+    rsi_oversold: float = 30,
+    rsi_overbought: float = 70,
+    exact: Optional[Dict[Tuple[int, int, int, int], Dict[str, float]]] = None,
+) -> np.ndarray:
+    """
+    Net score generate_trading_signal_simple's rules give on each backtest day.
+
+    `features` come from _backtest_features (one card, or several cards laid
+    end to end with `first` / `end` pointing into their joined `prices`) and
+    must include the `ma_short` / `ma_long` and `rsi_window` windows. Days
+    where an indicator lands within rounding distance of a decision threshold
+    (or an MA tie that is not exact) are re-scored with `_series_indicators`
+    on the window itself, so each day scores exactly like the per-day
+    computation with the same parameters. Days with fewer than 5 days of
+    history score 0.
+
+    `exact` optionally keeps those per-window indicators, keyed by
+    (day, ma_short, ma_long, rsi_window), for calls that only change the
+    thresholds.
+    """
+    first, end, length = features["first"], features["end"], features["length"]
+    current_price, slope_pct = features["current_price"], features["slope_pct"]
+    short_ma, short_exact = features["ma"][ma_short]
+    long_ma, long_exact = features["ma"][ma_long]
+    rsi = features["rsi"][rsi_window]
+    thresholds = dict(slope_threshold=slope_threshold, rsi_oversold=rsi_oversold, rsi_overbought=rsi_overbought)
+
+    # Windows no longer than the short MA: both MAs average the same values and are equal
+    same_ma = np.minimum(ma_short, length) == np.minimum(ma_long, length)
+    long_ma = np.where(same_ma, short_ma, long_ma)
+
+    net = _score_signals(short_ma, long_ma, slope_pct, rsi, current_price, np.zeros(len(end)), **thresholds)["net"]
+
+    # Re-score days whose decisions are within rounding distance of a threshold
+    def near(a, b):
+        return np.isclose(a, b, rtol=1e-9, atol=1e-12)
+
+    ambiguous = (
+        (near(short_ma, long_ma) & ~(short_exact & long_exact) & ~same_ma)
+        | (near(current_price, long_ma) & ~long_exact)
+        | near(np.abs(slope_pct), slope_threshold)
+        | near(rsi, rsi_oversold) | near(rsi, rsi_overbought)
+    ) & (length >= 5)
+    exact = {} if exact is None else exact
+    for step in np.flatnonzero(ambiguous):
+        key = (step, ma_short, ma_long, rsi_window)
+        ind = exact.get(key)
+        if ind is None:
+            window = features["prices"][first[step]:end[step] + 1]
+            ind = exact[key] = _series_indicators(window, rsi_window, (ma_short, ma_long))
+        net[step] = _score_signals(
+            np.array([ind[f"ma_{ma_short}"]]), np.array([ind[f"ma_{ma_long}"]]), np.array([ind["slope_pct"]]),
+            np.array([ind["rsi"]]), np.array([current_price[step]]), np.zeros(1), **thresholds,
+        )["net"][0]
+
+    net[length < 5] = 0.0
+    return net
+
+
+def _backtest_signals(daily_all: pd.Series, lookback_days: int, rsi_window: int = 14) -> np.ndarray:
+    """
+    Signal generate_trading_signal_simple would give on each backtest day.
+
+    Each day gets the signal generate_trading_signal_simple gives for the
+    daily series up to the previous day (see _backtest_net).
+    """
+    features = _backtest_features(daily_all, lookback_days, (5, 15), (rsi_window,))
+    if features is None:
+        return np.full(0, "Hold", dtype=object)
+    return _net_signals(_backtest_net(features, 5, 15, rsi_window)).astype(object)
+
+
+def _backtest_series(daily_all: pd.Series, lookback_days: int, initial_capital: float) -> Dict[str, Any]:
+    """Run the all-in / all-out strategy over a daily price series."""
     days = list(daily_all.index)
+    day_prices = daily_all.to_numpy(dtype=float)
+    signals = _backtest_signals(daily_all, lookback_days)
 
     capital = initial_capital
     position = 0.0
@@ -426,24 +928,17 @@ def backtest_trading_signals(
     # iterate day-by-day starting after lookback_days
     for i in range(lookback_days, len(days)):
         current_day = days[i]
-        # historical = all days up to previous day
-        historical_days = days[:i]
-        historical_series = daily_all.loc[historical_days]
-        # build a DataFrame shaped like price_history for the signal function
-        hist_df = pd.DataFrame({"date": historical_series.index, "price": historical_series.values})
-        hist_df["card_id"] = card_id
-
-        sig = generate_trading_signal_simple(card_id, hist_df, lookback_days=lookback_days)
+        signal = signals[i - lookback_days]
 
-        current_price = float(daily_all.loc[current_day])
+        current_price = float(day_prices[i])
 
         # Execute signals: buy all or sell all
-        if sig["signal"] in ["Strong Buy", "Buy"] and position == 0.0:
+        if signal in ["Strong Buy", "Buy"] and position == 0.0:
             position = capital / current_price
             last_buy_price = current_price
             trades.append({"date": current_day, "action": "BUY", "price": current_price, "quantity": position})
             capital = 0.0
-        elif sig["signal"] in ["Strong Sell", "Sell"] and position > 0.0:
+        elif signal in ["Strong Sell", "Sell"] and position > 0.0:
             capital = position * current_price
             trades.append({"date": current_day, "action": "SELL", "price": current_price, "quantity": position})
             if last_buy_price is not None:
@@ -460,7 +955,7 @@ def backtest_trading_signals(
         equity_curve.append({"date": current_day, "equity": equity})
 
     # finalize
-    final_price = float(daily_all.iloc[-1])
+    final_price = float(day_prices[-1])
     final_value = capital + position * final_price
     total_return = (final_value - initial_capital) / initial_capital * 100.0
     num_trades = len(trades)
@@ -472,16 +967,414 @@ def backtest_trading_signals(
     max_drawdown = float(drawdown.min()) if not drawdown.empty else 0.0
 
     return {
-        "card_id": card_id,
-        "start_date": start_date,
-        "end_date": end_date,
-        "initial_capital": initial_capital,
         "final_value": float(final_value),
         "total_return_pct": float(total_return),
         "num_trades": num_trades,
         "closed_trades": closed_trades,
+        "wins": wins,
         "win_rate_pct": float(win_rate) if win_rate is not None else None,
         "max_drawdown_pct": float(max_drawdown * 100.0),
         "trades": trades,
         "equity_curve": eq_df.reset_index().to_dict(orient="records"),
-    }
\ No newline at end of file
+    }
+
+
+
+# Batch backtester
+
+# Price arrays of the running batch, set once per worker process by _init_backtest_worker
+_WORKER_BATCH: Optional[Dict[str, Any]] = None
+
+
+def _init_backtest_worker(batch: Dict[str, Any]) -> None:
+    global _WORKER_BATCH
+    _WORKER_BATCH = batch
+
+
+def _backtest_batch(
+    card_ids: List[Any],
+    price_history: pd.DataFrame,
+    condition: str | None,
+    **settings: Any,
+) -> Dict[str, Any]:
+    """
+    Compact (date, price) arrays of the requested cards, grouped by card.
+
+    Card i's rows are `dates[bounds[i]:bounds[i + 1]]`, in their original
+    order. `settings` (backtest period, lookback, ...) are stored alongside.
+    """
+    df = price_history
+    if condition is not None:
+        df = df[df["condition"] == condition]
+    card_col, date_col, price_col = _backtest_columns(df.columns)
+    df = df[df[card_col].isin(card_ids)]
+
+    codes = pd.Index(card_ids, dtype=object).get_indexer(df[card_col])
+    order = np.argsort(codes, kind="stable")
+    return {
+        "dates": _naive_dates(df[date_col]).to_numpy(dtype="datetime64[ns]")[order],
+        "prices": df[price_col].to_numpy(dtype=float)[order],
+        "bounds": np.searchsorted(codes[order], np.arange(len(card_ids) + 1)),
+        **settings,
+    }
+
+
+def _backtest_batch_card(batch: Dict[str, Any], code: int) -> Tuple[int, Optional[Dict[str, Any]], Optional[str], float]:
+    """Backtest one card of a batch. Returns (code, result, error, seconds)."""
+    started = time.perf_counter()
+    lo, hi = batch["bounds"][code], batch["bounds"][code + 1]
+    dfc = pd.DataFrame({"date": batch["dates"][lo:hi], "price": batch["prices"][lo:hi]})
+    try:
+        daily_all = _backtest_window(dfc, batch["start_date"], batch["end_date"], batch["lookback_days"])
+        result = _backtest_series(daily_all, batch["lookback_days"], batch["initial_capital"])
+        error = None
+    except ValueError as e:
+        result, error = None, str(e)
+    return code, result, error, time.perf_counter() - started
+
+
+def _backtest_worker_task(code: int) -> Tuple[int, Optional[Dict[str, Any]], Optional[str], float]:
+    return _backtest_batch_card(_WORKER_BATCH, code)
+
+
+def backtest_portfolio(
+    card_ids: Iterable[Any],
+    price_history: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    lookback_days: int = 30,
+    initial_capital: float = 1000.0,
+    *,
+    condition: str | None = None,
+    max_workers: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Backtest the simple trading strategy on many cards (e.g. a whole set or a portfolio).
+
+    Every card is traded independently with its own `initial_capital`, exactly as
+    backtest_trading_signals would, and the cards' equity curves are summed into
+    one portfolio equity curve. A card's equity is its starting cash before its
+    first backtest day and stays at its last value after its final day.
+
+    The requested cards' rows are reduced once to compact (date, price) arrays
+    grouped by card. With `max_workers` > 1 the cards are spread over a process
+    pool whose workers receive those arrays once, at start-up, instead of with
+    every task.
+
+    Input:
+        card_ids: Required. Cards to backtest; cards without enough data are
+                  reported in the per-card table and left out of the portfolio.
+        condition: Optional. Only use rows of this condition (e.g. "Near Mint").
+        max_workers: Optional. Worker processes; defaults to the CPU count, and
+                     1 runs every card in this process.
+    Returns:
+        dict with the portfolio summary (same keys as backtest_trading_signals),
+        its equity curve, `cards` (pd.DataFrame, one row per card with its
+        summary, error and backtest time in seconds), `results` (full
+        per-card backtests by card_id) and `elapsed_seconds`.
+    """
+    started = time.perf_counter()
+    card_ids = list(pd.unique(pd.Series(list(card_ids), dtype=object)))
+
+    batch = _backtest_batch(
+        card_ids, price_history, condition,
+        start_date=start_date, end_date=end_date,
+        lookback_days=lookback_days, initial_capital=initial_capital,
+    )
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(card_ids))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers, initializer=_init_backtest_worker, initargs=(batch,)) as pool:
+            outcomes = list(pool.map(_backtest_worker_task, range(len(card_ids)),
+                                     chunksize=max(1, len(card_ids) // (max_workers * 4))))
+    else:
+        outcomes = [_backtest_batch_card(batch, code) for code in range(len(card_ids))]
+
+    # Per-card table and full results
+    results: Dict[Any, Dict[str, Any]] = {}
+    rows: List[Dict[str, Any]] = []
+    curves: Dict[Any, pd.Series] = {}
+    for code, result, error, seconds in outcomes:
+        card_id = card_ids[code]
+        row = {"card_id": card_id, "error": error, "seconds": seconds}
+        if result is not None:
+            results[card_id] = {
+                "card_id": card_id,
+                "start_date": start_date,
+                "end_date": end_date,
+                "initial_capital": initial_capital,
+                **result,
+            }
+            row.update({k: v for k, v in result.items() if k not in ("trades", "equity_curve")})
+            curve = pd.DataFrame(result["equity_curve"])
+            if not curve.empty:
+                curves[card_id] = curve.set_index("date")["equity"]
+        rows.append(row)
+
+    cards = pd.DataFrame(rows, columns=[
+        "card_id", "final_value", "total_return_pct", "num_trades", "closed_trades",
+        "wins", "win_rate_pct", "max_drawdown_pct", "error", "seconds",
+    ])
+
+    # Portfolio equity: sum of the card curves on their combined dates
+    portfolio_capital = initial_capital * len(results)
+    if curves:
+        equity = pd.concat(curves, axis=1).sort_index().ffill().fillna(initial_capital)
+        equity = equity.sum(axis=1) + initial_capital * (len(results) - len(curves))
+    else:
+        equity = pd.Series(dtype=float)
+    running_max = equity.cummax()
+    drawdown = (equity - running_max) / running_max
+    max_drawdown = float(drawdown.min()) if not drawdown.empty else 0.0
+
+    final_value = float(sum(r["final_value"] for r in results.values()))
+    total_return = (final_value - portfolio_capital) / portfolio_capital * 100.0 if portfolio_capital else 0.0
+    closed_trades = int(sum(r["closed_trades"] for r in results.values()))
+    wins = int(sum(r["wins"] for r in results.values()))
+    win_rate = (wins / closed_trades * 100.0) if closed_trades > 0 else None
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "initial_capital": portfolio_capital,
+        "final_value": final_value,
+        "total_return_pct": float(total_return),
+        "num_trades": int(sum(r["num_trades"] for r in results.values())),
+        "closed_trades": closed_trades,
+        "wins": wins,
+        "win_rate_pct": float(win_rate) if win_rate is not None else None,
+        "max_drawdown_pct": float(max_drawdown * 100.0),
+        "equity_curve": equity.rename_axis("date").rename("equity").reset_index().to_dict(orient="records"),
+        "cards": cards,
+        "results": results,
+        "elapsed_seconds": time.perf_counter() - started,
+    }
+
+
+
+# Parameter sweep
+
+# Tunable signal parameters and their defaults (the values generate_trading_signal uses)
+SWEEP_PARAMS = {
+    "ma_short": 5,
+    "ma_long": 15,
+    "rsi_window": 14,
+    "rsi_oversold": 30,
+    "rsi_overbought": 70,
+    "slope_threshold": 0.001,
+    "score_band": 2,
+}
+
+
+def _parameter_combinations(param_grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Every valid combination of the grid, with untouched parameters at their defaults."""
+    unknown = set(param_grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise KeyError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    values = [list(param_grid.get(name, [default])) for name, default in SWEEP_PARAMS.items()]
+    combos = [dict(zip(SWEEP_PARAMS, combo)) for combo in itertools.product(*values)]
+    return [
+        c for c in combos
+        if c["ma_short"] < c["ma_long"] and c["rsi_oversold"] < c["rsi_overbought"]
+    ]
+
+
+def _simulate_all_in(action: np.ndarray, price: np.ndarray, starts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Vectorized _backtest_series for many cards laid end to end.
+
+    `action` is +1 (buy), -1 (sell) or 0 per day, `starts` the first row of
+    each card. All-in / all-out means a card is invested exactly when its
+    latest buy or sell action was a buy, so positions, equity and trades
+    follow from running maxima and cumulative sums instead of a day loop.
+    Returns per-card return, max drawdown (both in %), trades, closed trades and wins.
+    """
+    n = len(action)
+    pos = np.arange(n)
+    card = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+    card_start = starts[card]
+
+    last_action = np.maximum.accumulate(np.where(action != 0, pos, -1))
+    holding = (last_action >= card_start) & (action[np.maximum(last_action, 0)] == 1)
+    held_before = np.concatenate(([False], holding[:-1]))
+    held_before[starts] = False
+
+    # Equity relative to the starting capital
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.where(held_before, price / np.concatenate(([np.nan], price[:-1])), 1.0)
+    log_growth = np.log(growth)
+    cum = np.cumsum(log_growth)
+    log_equity = cum - (cum - log_growth)[card_start]
+    equity = np.exp(log_equity)
+
+    running_max = pd.Series(equity).groupby(card).cummax().to_numpy()
+    drawdown = (equity - running_max) / running_max
+
+    buys = holding & ~held_before
+    sells = ~holding & held_before
+    last_buy = np.maximum.accumulate(np.where(buys, pos, 0))
+    wins = sells & (price > price[last_buy])
+
+    ends = np.append(starts[1:], n) - 1
+    return {
+        "return_pct": (equity[ends] - 1.0) * 100.0,
+        "max_drawdown_pct": np.minimum.reduceat(drawdown, starts) * 100.0,
+        "num_trades": np.add.reduceat((buys | sells).astype(int), starts),
+        "closed_trades": np.add.reduceat(sells.astype(int), starts),
+        "wins": np.add.reduceat(wins.astype(int), starts),
+    }
+
+
+def _sweep_chunk(batch: Dict[str, Any], codes: List[int]) -> Dict[str, np.ndarray]:
+    """Per-card results of every combination for a chunk of cards, shaped (combos, cards)."""
+    combos = batch["combos"]
+    ma_windows = sorted({c["ma_short"] for c in combos} | {c["ma_long"] for c in combos})
+    rsi_windows = sorted({c["rsi_window"] for c in combos})
+    lookback_days = batch["lookback_days"]
+
+    # Features of every card, computed once and shared by all combinations
+    parts, kept = [], []
+    for code in codes:
+        lo, hi = batch["bounds"][code], batch["bounds"][code + 1]
+        dfc = pd.DataFrame({"date": batch["dates"][lo:hi], "price": batch["prices"][lo:hi]})
+        try:
+            daily_all = _backtest_window(dfc, batch["start_date"], batch["end_date"], lookback_days)
+        except ValueError:
+            continue
+        features = _backtest_features(daily_all, lookback_days, ma_windows, rsi_windows)
+        if features is not None:
+            features["trade_price"] = daily_all.to_numpy(dtype=float)[lookback_days:]
+            parts.append(features)
+            kept.append(code)
+
+    if not parts:
+        return {"codes": np.array([], dtype=int)}
+
+    def stack(get):
+        return np.concatenate([get(f) for f in parts])
+
+    # All cards laid end to end; window bounds point into the joined prices
+    offsets = np.cumsum([0] + [len(f["prices"]) for f in parts[:-1]])
+    joined = {
+        "first": np.concatenate([f["first"] + o for f, o in zip(parts, offsets)]),
+        "end": np.concatenate([f["end"] + o for f, o in zip(parts, offsets)]),
+        "length": stack(lambda f: f["length"]),
+        "prices": stack(lambda f: f["prices"]),
+        "current_price": stack(lambda f: f["current_price"]),
+        "slope_pct": stack(lambda f: f["slope_pct"]),
+        "ma": {k: (stack(lambda f: f["ma"][k][0]), stack(lambda f: f["ma"][k][1])) for k in ma_windows},
+        "rsi": {w: stack(lambda f: f["rsi"][w]) for w in rsi_windows},
+    }
+    trade_price = stack(lambda f: f["trade_price"])
+    starts = np.cumsum([0] + [len(f["length"]) for f in parts[:-1]])
+
+    out: Dict[str, List[np.ndarray]] = {}
+    exact: Dict[Tuple[int, int, int, int], Dict[str, float]] = {}
+    for combo in combos:
+        net = _backtest_net(
+            joined, combo["ma_short"], combo["ma_long"], combo["rsi_window"],
+            slope_threshold=combo["slope_threshold"],
+            rsi_oversold=combo["rsi_oversold"],
+            rsi_overbought=combo["rsi_overbought"],
+            exact=exact,
+        )
+        action = np.select([net >= combo["score_band"], net <= -combo["score_band"]], [1, -1], default=0)
+
+        for key, values in _simulate_all_in(action, trade_price, starts).items():
+            out.setdefault(key, []).append(values)
+
+    result = {key: np.vstack(values) for key, values in out.items()}
+    result["codes"] = np.array(kept)
+    return result
+
+
+def _sweep_worker_task(codes: List[int]) -> Dict[str, np.ndarray]:
+    return _sweep_chunk(_WORKER_BATCH, codes)
+
+
+def sweep_trading_signals(
+    card_ids: Iterable[Any],
+    price_history: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    param_grid: Dict[str, Iterable[Any]],
+    lookback_days: int = 30,
+    *,
+    condition: str | None = None,
+    max_workers: int | None = None,
+    chunk_size: int = 50,
+) -> pd.DataFrame:
+    """
+    Backtest the simple strategy for every combination of signal parameters.
+
+    Each card's indicators (every MA and RSI window in the grid, trend slope)
+    are computed once and reused by all combinations, which then only rescore
+    and replay the all-in / all-out trades in vectorized form. Cards are
+    processed in chunks of `chunk_size`, spread over a process pool when
+    `max_workers` > 1 (defaults to the CPU count; 1 runs in-process).
+
+    Days are scored by the same code as backtest_trading_signals
+    (_backtest_net), including the exact re-scoring of days near a
+    threshold, so the default combination trades exactly like
+    backtest_portfolio.
+
+    Input:
+        card_ids: Required. Cards to backtest; cards without enough data are skipped.
+        param_grid: Required. {parameter: values} for any of SWEEP_PARAMS, e.g.
+                    {"rsi_oversold": [25, 30], "ma_long": [10, 15, 20]}; missing
+                    parameters keep their defaults. Combinations with
+                    ma_short >= ma_long or rsi_oversold >= rsi_overbought are skipped.
+        condition: Optional. Only use rows of this condition (e.g. "Near Mint").
+    Returns:
+        pd.DataFrame, one row per combination ranked by total_return_pct, with the
+        parameters, cards, total_return_pct (equal capital per card),
+        median_return_pct, avg_max_drawdown_pct, worst_max_drawdown_pct,
+        num_trades, closed_trades and win_rate_pct.
+    """
+    combos = _parameter_combinations(param_grid)
+    card_ids = list(pd.unique(pd.Series(list(card_ids), dtype=object)))
+
+    batch = _backtest_batch(
+        card_ids, price_history, condition,
+        start_date=start_date, end_date=end_date,
+        lookback_days=lookback_days, combos=combos,
+    )
+
+    chunks = [list(range(i, min(i + chunk_size, len(card_ids)))) for i in range(0, len(card_ids), chunk_size)]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+    if combos and max_workers > 1:
+        with ProcessPoolExecutor(max_workers, initializer=_init_backtest_worker, initargs=(batch,)) as pool:
+            parts = list(pool.map(_sweep_worker_task, chunks))
+    elif combos:
+        parts = [_sweep_chunk(batch, chunk) for chunk in chunks]
+    else:
+        parts = []
+
+    parts = [p for p in parts if len(p["codes"])]
+    stats = {key: np.hstack([p[key] for p in parts]) for key in parts[0] if key != "codes"} if parts else {}
+
+    rows = []
+    for i, combo in enumerate(combos):
+        row = dict(combo)
+        if stats:
+            closed = int(stats["closed_trades"][i].sum())
+            row.update({
+                "cards": stats["return_pct"].shape[1],
+                "total_return_pct": float(stats["return_pct"][i].mean()),
+                "median_return_pct": float(np.median(stats["return_pct"][i])),
+                "avg_max_drawdown_pct": float(stats["max_drawdown_pct"][i].mean()),
+                "worst_max_drawdown_pct": float(stats["max_drawdown_pct"][i].min()),
+                "num_trades": int(stats["num_trades"][i].sum()),
+                "closed_trades": closed,
+                "win_rate_pct": float(stats["wins"][i].sum() / closed * 100.0) if closed else None,
+            })
+        else:
+            row["cards"] = 0
+        rows.append(row)
+
+    table = pd.DataFrame(rows, columns=list(SWEEP_PARAMS) + [
+        "cards", "total_return_pct", "median_return_pct", "avg_max_drawdown_pct",
+        "worst_max_drawdown_pct", "num_trades", "closed_trades", "win_rate_pct",
+    ])
+    return table.sort_values("total_return_pct", ascending=False, kind="mergesort").reset_index(drop=True)
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _window_label(window: Optional[int]) -> str:
+    return "all" if window is None else f"{window}d"
+
+
+class TrendTable:
+    """
+    Price trend of every card over trailing windows, computed once per data load.
+
+    Rows are sorted by (card, date) and the least-squares slope of each card's
+    last `window` days comes from per-card cumulative sums of y and x*y, so
+    all cards and windows are fitted in a few vectorized passes instead of
+    one `np.polyfit` per card. x is the row position in chronological order.
+
+    Args:
+        price_history_df (pd.DataFrame): Price history with `tcgPlayerId`, `date`
+                                         and the value column.
+        windows (Iterable[int | None]): Trailing windows in days; None covers
+                                        the card's whole history.
+        value_column (str): Column holding the price. Rows where it is NaN are skipped.
+        condition (str, optional): Only use rows of this condition (e.g. "Near Mint").
+        threshold (float): Default minimum % change (as a fraction) for a trend.
+    """
+
+    def __init__(self, price_history_df: pd.DataFrame, windows: Iterable[Optional[int]] = (None, 30, 7),
+                 value_column: str = "market", condition: Optional[str] = None, threshold: float = 0.02) -> None:
+        self.windows = list(windows)
+        self.value_column = value_column
+        self.condition = condition
+        self.threshold = threshold
+        self.reload(price_history_df)
+
+    def reload(self, price_history_df: pd.DataFrame) -> None:
+        """Refit every card and window on new price history."""
+        df = price_history_df
+        if self.condition is not None:
+            df = df[df["condition"] == self.condition]
+        df = df[df[self.value_column].notna()].sort_values(["tcgPlayerId", "date"], kind="mergesort")
+
+        codes, card_ids = pd.factorize(df["tcgPlayerId"])
+        dates = df["date"].to_numpy(dtype="datetime64[ns]")
+        y = df[self.value_column].to_numpy(dtype=float)
+
+        # Card blocks and their latest dates
+        hi = np.searchsorted(codes, np.arange(len(card_ids)), side="right")
+        first = np.searchsorted(codes, np.arange(len(card_ids)), side="left")
+        last_date = dates[hi - 1] if len(y) else np.array([], dtype="datetime64[ns]")
+
+        # Per-card prefix sums (kept per card so they stay small and precise)
+        x = np.arange(len(y)) - first[codes]
+        y_sum = pd.Series(y).groupby(codes).cumsum().to_numpy()
+        xy_sum = pd.Series(x * y).groupby(codes).cumsum().to_numpy()
+
+        def block_sum(prefix: np.ndarray, lo: np.ndarray) -> np.ndarray:
+            """Sum over rows [lo, hi) of each card."""
+            before = np.where(lo > first, prefix[np.maximum(lo - 1, 0)], 0.0)
+            return prefix[hi - 1] - before
+
+        # Sorting by (card, date) makes (code, date) keys increasing
+        unique_dates = np.unique(dates)
+        stride = len(unique_dates) + 1
+        keys = codes.astype(np.int64) * stride + np.searchsorted(unique_dates, dates)
+
+        self.card_ids = card_ids
+        self._rows = {card_id: i for i, card_id in enumerate(card_ids.tolist())}
+        columns: Dict[str, np.ndarray] = {}
+        for window in self.windows:
+            if window is None:
+                lo = first
+            else:
+                cutoff = last_date - np.timedelta64(window - 1, "D")
+                cutoff_rank = np.searchsorted(unique_dates, cutoff)
+                lo = np.searchsorted(keys, np.arange(len(card_ids), dtype=np.int64) * stride + cutoff_rank)
+
+            n = hi - lo
+            with np.errstate(invalid="ignore", divide="ignore"):
+                s_y = block_sum(y_sum, lo)
+                s_xy = block_sum(xy_sum, lo) - (lo - first) * s_y    # x counted from the window's first row
+                slope = (s_xy - (n - 1) / 2.0 * s_y) / (n * (n ** 2 - 1) / 12.0)
+                start, end = y[np.minimum(lo, len(y) - 1)], y[hi - 1]
+                pct_change = (end - start) / start
+
+            enough = n >= 2
+            label = _window_label(window)
+            columns[f"slope_{label}"] = np.where(enough, slope, np.nan)
+            columns[f"pct_change_{label}"] = np.where(enough, pct_change, np.nan)
+            columns[f"n_{label}"] = n
+
+        self.table = pd.DataFrame(columns, index=pd.Index(card_ids, name="tcgPlayerId"))
+        self._values = {label: self.table[[f"slope_{label}", f"pct_change_{label}"]].to_numpy()
+                        for label in map(_window_label, self.windows)}
+
+    # -------------------- LOOKUPS --------------------
+    @staticmethod
+    def _classify(slope: float, pct_change: float, threshold: float) -> str:
+        if np.isnan(slope):
+            return "not enough data"
+        if slope > 0 and pct_change > threshold:
+            return "up"
+        elif slope < 0 and pct_change < -threshold:
+            return "down"
+        return "stable"
+
+    def stats(self, card_id: Any, window: Optional[int] = None) -> Optional[Tuple[float, float]]:
+        """(slope per row, % change as a fraction) of one card, or None if it has no prices."""
+        row = self._rows.get(card_id)
+        if row is None:
+            return None
+        slope, pct_change = self._values[_window_label(window)][row]
+        return float(slope), float(pct_change)
+
+    def trend(self, card_id: Any, window: Optional[int] = None, threshold: Optional[float] = None) -> str:
+        """
+        "up", "down" or "stable" for one card over `window`, or "not enough data".
+
+        Trending up needs a positive slope and a % change above `threshold`
+        (default: the table's), trending down the mirror image.
+        """
+        stats = self.stats(card_id, window)
+        if stats is None:
+            return "not enough data"
+        return self._classify(*stats, self.threshold if threshold is None else threshold)
+
+    def trends(self, card_ids: Iterable[Any], window: Optional[int] = None, threshold: Optional[float] = None) -> List[str]:
+        """`trend` for many cards."""
+        return [self.trend(card_id, window, threshold) for card_id in card_ids]
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Iterable, List, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class VariantPriceTable:
+    """
+    Price and listings of each card per print variant (Holofoil, Reverse
+    Holofoil, Normal, ...) and condition.
+
+    Rows are sorted by (card, variant, condition) and get an integer key
+    `(card_code * n_variants + variant_code) * n_conditions + condition_code`,
+    so single and batched lookups are one `np.searchsorted` and each card's
+    rows are a contiguous block.
+
+    Args:
+        variant_prices_df (pd.DataFrame): Long table from `split_variant_prices`
+                                          (tcgPlayerId, variant, condition, price, listings).
+    """
+
+    def __init__(self, variant_prices_df: pd.DataFrame) -> None:
+        df = variant_prices_df.sort_values(["tcgPlayerId", "variant", "condition"], kind="mergesort")
+        self.table = df.set_index(["tcgPlayerId", "variant", "condition"])
+
+        card_codes, self.card_ids = pd.factorize(df["tcgPlayerId"], sort=True)
+        self.variants: List[str] = sorted(str(v) for v in pd.unique(df["variant"].astype(object)))
+        self.conditions: List[str] = sorted(str(c) for c in pd.unique(df["condition"].astype(object)))
+        self._variant_codes = {v: i for i, v in enumerate(self.variants)}
+        self._condition_codes = {c: i for i, c in enumerate(self.conditions)}
+
+        variant_codes = df["variant"].astype(object).map(self._variant_codes).to_numpy(dtype=np.int64)
+        condition_codes = df["condition"].astype(object).map(self._condition_codes).to_numpy(dtype=np.int64)
+        self._keys = (card_codes.astype(np.int64) * len(self.variants) + variant_codes) * len(self.conditions) + condition_codes
+        self._starts = np.searchsorted(card_codes, np.arange(len(self.card_ids)), side="left")
+        self._stops = np.searchsorted(card_codes, np.arange(len(self.card_ids)), side="right")
+        self._values = {field: df[field].to_numpy(dtype=float) for field in ("price", "listings")}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _rows(self, card_ids: np.ndarray, variant: str, condition: str) -> np.ndarray:
+        """Row of each (card, variant, condition); -1 where there is none."""
+        rows = np.full(len(card_ids), -1)
+        v, c = self._variant_codes.get(variant), self._condition_codes.get(condition)
+        if v is None or c is None or not len(self._keys):
+            return rows
+
+        codes = self.card_ids.get_indexer(card_ids)
+        known = codes >= 0
+        keys = (codes[known].astype(np.int64) * len(self.variants) + v) * len(self.conditions) + c
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        rows[known] = np.where(self._keys[pos] == keys, pos, -1)
+        return rows
+
+    # -------------------- LOOKUPS --------------------
+    def lookup(self, card_ids: Iterable[Any], variant: str, condition: str = "Near Mint",
+               field: str = "price") -> np.ndarray:
+        """
+        `field` ("price" or "listings") of one variant and condition for many cards.
+
+        Returns:
+            np.ndarray: One value per card; NaN where the card has no such variant price.
+        """
+        rows = self._rows(np.asarray(list(card_ids)), variant, condition)
+        return np.where(rows >= 0, self._values[field][rows], np.nan)
+
+    def price(self, card_id: Any, variant: str, condition: str = "Near Mint") -> Optional[float]:
+        """Price of one card's variant in `condition`, or None if there is none."""
+        price = self.lookup([card_id], variant, condition)[0]
+        return None if np.isnan(price) else float(price)
+
+    def card(self, card_id: Any) -> pd.DataFrame:
+        """All variant / condition rows of one card, indexed by (variant, condition)."""
+        code = self.card_ids.get_indexer([card_id])[0]
+        if code < 0:
+            return self.table.iloc[0:0].droplevel("tcgPlayerId")
+        return self.table.iloc[self._starts[code]:self._stops[code]].droplevel("tcgPlayerId")
+
+    def compare(self, card_id: Any, condition: str = "Near Mint", field: str = "price") -> pd.Series:
+        """One card's `field` per variant in `condition`, e.g. Holofoil vs Reverse Holofoil."""
+        values = [self.lookup([card_id], variant, condition, field)[0] for variant in self.variants]
+        return pd.Series(values, index=pd.Index(self.variants, name="variant"), name=field).dropna()
+
+    def matrix(self, card_ids: Optional[Iterable[Any]] = None, condition: str = "Near Mint",
+               field: str = "price") -> pd.DataFrame:
+        """Card x variant frame of `field` in `condition` (all cards when `card_ids` is None)."""
+        card_ids = self.card_ids if card_ids is None else pd.Index(list(card_ids))
+        return pd.DataFrame(
+            {variant: self.lookup(card_ids, variant, condition, field) for variant in self.variants},
+            index=pd.Index(card_ids, name="tcgPlayerId"),
+        )